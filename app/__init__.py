@@ -2,9 +2,8 @@ from flask import Flask, redirect, url_for
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
-from config import Config
+from config import CONFIG_PROFILES
 import os
-from datetime import datetime, timedelta
 
 # 初始化插件
 db = SQLAlchemy()
@@ -15,77 +14,79 @@ login_manager.login_message_category = 'info'
 bcrypt = Bcrypt()
 
 
-def create_app(config_class=Config):
+def create_app(config_class=None):
+    if config_class is None:
+        profile = os.environ.get('APP_CONFIG', 'development')
+        if profile not in CONFIG_PROFILES:
+            raise ValueError(f'Unknown APP_CONFIG profile: {profile} (choose from {", ".join(CONFIG_PROFILES)})')
+        config_class = CONFIG_PROFILES[profile]
     app = Flask(__name__)
     app.config.from_object(config_class)
+    # 上传文件边接收边计算哈希，直接落盘到上传目录
+    from app.services.storage import UploadRequest
+    app.request_class = UploadRequest
 
-    # 绑定插件
-    db.init_app(app)
+    # 绑定插件（数据库按后端设置连接池参数与 SQLite PRAGMA）
+    from app.database import init_database
+    init_database(app)
     login_manager.init_app(app)
     bcrypt.init_app(app)
 
+    # 密码哈希服务（可配置成本因子与进程池后端）
+    from app.services.passwords import init_password_hasher
+    init_password_hasher(app)
+
+    # 登录用户身份缓存（减少每个请求的用户查询）
+    from app.services.identity import init_identity_cache
+    init_identity_cache(app)
+
+    # 请求级 SQL 查询数 / 耗时统计（/admin/metrics）
+    from app.services.instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    # 登录/注册限流（保护 bcrypt CPU 预算）
+    from app.services.ratelimit import init_rate_limiter
+    init_rate_limiter(app)
+    if app.config['PROXY_FIX_X_FOR']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        hops = app.config['PROXY_FIX_X_FOR']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    # 静态资源指纹 URL / 长期缓存，以及大响应的 gzip 压缩
+    from app.services.assets import init_assets
+    from app.services.compression import init_compression
+    init_assets(app)
+    init_compression(app)
+
     # 注册蓝图
     from app.auth.routes import auth_bp
     from app.competitions.routes import comp_bp
     from app.admin.routes import admin_bp
+    from app.api.routes import api_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(comp_bp, url_prefix='/competitions')
     app.register_blueprint(admin_bp, url_prefix='/admin')
+    app.register_blueprint(api_bp, url_prefix='/api/v1')
+
+    # 注册命令行工具（flask upgrade-db 等）
+    from app.commands import register_commands
+    register_commands(app)
 
     # 注册主页路由（根路径）
     @app.route('/')
     def index():
         return redirect(url_for('competitions.list'))
 
-    with app.app_context():
-        os.makedirs(app.instance_path, exist_ok=True)
-
-        db.create_all()
-
-        from app.models.user import User
-        from app.models.competition import Competition
-
-        if not User.query.filter_by(username='admin').first():
-            admin = User(
-                username='admin',
-                email='admin@phg.com',
-                password='Admin123!',  # 复用 User 模型的 password setter 自动加密
-                consent_given=True,
-                is_admin=True
-            )
-            db.session.add(admin)
-
-        if not Competition.query.first():
-            sample_competitions = [
-                Competition(
-                    name="2025 Highland Dance Competition",
-                    category="Individual",
-                    start_date=datetime.utcnow() + timedelta(days=30),
-                    application_deadline=datetime.utcnow() + timedelta(days=15),
-                    description="Traditional Scottish Highland dance competition, divided into solo jazz dance and duet tap dance categories. Contestants must submit a dance video as application material. Judges will score based on movement standardization and sense of rhythm."
-                ),
-                Competition(
-                    name="Bagpipe Ensemble Competition",
-                    category="Team",
-                    start_date=datetime.utcnow() + timedelta(days=45),
-                    application_deadline=datetime.utcnow() + timedelta(days=20),
-                    description="Team bagpipe performance competition. Each team consists of 3-5 members. Contestants must perform the designated traditional Scottish tune 'Scotland the Brave' with a performance duration of 5 minutes. Scoring criteria include tone, coordination, and expressiveness."
-                ),
-                Competition(
-                    name="Highland Weightlifting Challenge",
-                    category="Mixed",
-                    start_date=datetime.utcnow() + timedelta(days=60),
-                    application_deadline=datetime.utcnow() + timedelta(days=30),
-                    description="Traditional Highland strength competition, divided into individual and team relay categories. The weight for the individual category is 50kg, and the total relay weight for the team category (3 members) is 120kg. Rankings are determined by completion time."
-                )
-            ]
-            db.session.add_all(sample_competitions)
-
-        db.session.commit()
-    # --------------------------------------------------------------------------
+    os.makedirs(app.instance_path, exist_ok=True)
+
+    # 启动时默认不访问数据库；建表与初始数据请使用 flask bootstrap（开发环境可设置 AUTO_BOOTSTRAP=1）
+    if app.config['AUTO_BOOTSTRAP']:
+        from app.services.bootstrap import bootstrap_database
+        with app.app_context():
+            bootstrap_database()
 
     return app
 
 
 # 导入模型（确保模型被识别，本地开发用）
-from app.models import user, competition, application
+from app.models import user, competition, application, file_deletion_job
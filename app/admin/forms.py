@@ -1,6 +1,6 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, TextAreaField, DateTimeField, SelectField, SubmitField
-from wtforms.validators import DataRequired, Length
+from wtforms import StringField, TextAreaField, DateTimeField, SelectField, SubmitField, HiddenField, IntegerField
+from wtforms.validators import DataRequired, Length, Optional, NumberRange
 from app.models.competition import Competition
 
 class CompetitionForm(FlaskForm):
@@ -30,6 +30,10 @@ class CompetitionForm(FlaskForm):
         format='%Y-%m-%d %H:%M:%S',
         render_kw={'placeholder': 'Format: YYYY-MM-DD HH:MM:SS'}
     )
+    capacity = IntegerField(
+        'Capacity (Optional)',
+        validators=[Optional(), NumberRange(min=1, message='Capacity must be at least 1')]
+    )
     submit = SubmitField('Save Competition')
 
 class ApplicationReviewForm(FlaskForm):
@@ -43,4 +47,23 @@ class ApplicationReviewForm(FlaskForm):
         'Review Notes (Optional)',
         validators=[Length(max=500, message='Notes must not exceed 500 characters')]
     )
-    submit = SubmitField('Submit Review')
\ No newline at end of file
+    submit = SubmitField('Submit Review')
+
+class BulkReviewForm(FlaskForm):
+    """Bulk Application Review Form"""
+    status = SelectField(
+        'Review Result',
+        validators=[DataRequired(message='Please select a review result')],
+        choices=[('approved', 'Approve'), ('rejected', 'Reject')]
+    )
+    scope = SelectField(
+        'Apply To',
+        validators=[DataRequired(message='Please select which applications to update')],
+        choices=[('selected', 'Selected applications'), ('filter', 'All applications in this view')]
+    )
+    current_filter = HiddenField('Current Filter')
+    notes = StringField(
+        'Review Notes (Optional)',
+        validators=[Length(max=500, message='Notes must not exceed 500 characters')]
+    )
+    submit = SubmitField('Apply')
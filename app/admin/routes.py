@@ -1,14 +1,28 @@
-from flask import render_template, redirect, url_for, flash, request, current_app
+from flask import render_template, redirect, url_for, flash, request, current_app, jsonify, abort, Response, \
+    stream_with_context
 from flask_login import login_required, current_user
 from app.admin import admin_bp
-from app.admin.forms import CompetitionForm, ApplicationReviewForm
-from app.models.user import User
+from app.admin.forms import CompetitionForm, ApplicationReviewForm, BulkReviewForm
 from app.models.competition import Competition
 from app.models.application import Application
+from app.services.stats import get_dashboard_stats, invalidate_dashboard_stats
+from app.services.catalogue import bump_catalogue_version
+from app.services.cleanup import enqueue_document_deletions, kick_cleanup_worker
+from app.services.review import bulk_review
+from app.services.counters import record_status_changes
+from app.services.export import EXPORT_FORMATS, generate_export, parse_date
+from app.services.pagination import decode_cursor, get_page_size, keyset_page
+from app.services.search import application_filters, search_applications
+from app.services.storage import send_document
+from app.services.metrics import registry
 from app import db
+from sqlalchemy.orm import contains_eager
 from datetime import datetime  # 导入datetime模块
-import os
 from functools import wraps
+import hmac
+
+
+APPLICATION_STATUSES = ('pending', 'approved', 'rejected')
 
 
 # 管理员权限装饰器（确保只有管理员能访问）
@@ -28,36 +42,29 @@ def admin_required(f):
 @admin_required
 def dashboard():
     """管理员仪表盘"""
-    # 统计数据
-    total_users = User.query.count()
-    total_competitions = Competition.query.count()
-    total_applications = Application.query.count()
-    pending_applications = Application.query.filter_by(status='pending').count()
-    approved_applications = Application.query.filter_by(status='approved').count()
-    rejected_applications = Application.query.filter_by(status='rejected').count()
+    # 统计数据（单条聚合查询，带短 TTL 缓存）
+    stats = get_dashboard_stats()
 
     # 近期赛事（未来3个）- 移到路由中查询，避免模板直接操作模型
     upcoming_competitions = Competition.query.filter(
         Competition.start_date > datetime.utcnow()
     ).order_by(Competition.start_date).limit(3).all()
 
-    # 待审核申请（最新3个）- 关联User和Competition，确保app.user和app.competition可访问
+    # 待审核申请（最新3个）- 同一查询中填充 app.user 和 app.competition
     pending_apps = Application.query.filter_by(status='pending').join(
-        User
+        Application.user
     ).join(
-        Competition
+        Application.competition
+    ).options(
+        contains_eager(Application.user),
+        contains_eager(Application.competition)
     ).order_by(Application.submission_date.desc()).limit(3).all()
 
     # 传递Competition模型和datetime到模板（解决UndefinedError）
     return render_template(
         'admin/dashboard.html',
         title='Admin Dashboard',
-        total_users=total_users,
-        total_competitions=total_competitions,
-        total_applications=total_applications,
-        pending_applications=pending_applications,
-        approved_applications=approved_applications,
-        rejected_applications=rejected_applications,
+        **stats,
         upcoming_competitions=upcoming_competitions,
         pending_apps=pending_apps,
         Competition=Competition,
@@ -86,10 +93,13 @@ def create_competition():
             category=form.category.data,
             start_date=form.start_date.data,
             application_deadline=form.application_deadline.data,
+            capacity=form.capacity.data,
             description=form.description.data.strip()
         )
         db.session.add(competition)
         db.session.commit()
+        invalidate_dashboard_stats()
+        bump_catalogue_version()
         flash(f'Competition "{competition.name}" created successfully!', 'success')
         return redirect(url_for('admin.competition_list'))
     return render_template('admin/competition_form.html', title='Create New Competition', form=form)
@@ -108,8 +118,10 @@ def edit_competition(comp_id):
         competition.category = form.category.data
         competition.start_date = form.start_date.data
         competition.application_deadline = form.application_deadline.data
+        competition.capacity = form.capacity.data
         competition.description = form.description.data.strip()
         db.session.commit()
+        bump_catalogue_version()
         flash(f'Competition "{competition.name}" updated successfully!', 'success')
         return redirect(url_for('admin.competition_list'))
     return render_template('admin/competition_form.html', title=f'Edit Competition: {competition.name}', form=form,
@@ -122,40 +134,146 @@ def edit_competition(comp_id):
 def delete_competition(comp_id):
     """删除赛事"""
     competition = Competition.query.get_or_404(comp_id, description='This competition does not exist')
-    # 删除赛事关联的所有申请（级联删除）
-    applications = Application.query.filter_by(competition_id=comp_id).all()
-    for app in applications:
-        # 删除关联的上传文件
-        if app.document_filename:
-            user_upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], str(app.user_id))
-            file_path = os.path.join(user_upload_dir, app.document_filename)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        db.session.delete(app)
-    # 删除赛事
-    db.session.delete(competition)
+    competition_name = competition.name
+    # 记录需清理的上传文件，随后以集合式 SQL 删除申请和赛事
+    documents = db.session.query(
+        Application.user_id, Application.document_filename, Application.document_sha256
+    ).filter(Application.competition_id == comp_id, Application.document_filename.isnot(None)).all()
+    Application.query.filter_by(competition_id=comp_id).delete(synchronize_session=False)
+    Competition.query.filter_by(id=comp_id).delete(synchronize_session=False)
+    # 文件删除任务与数据删除在同一事务中提交，由后台线程分批处理
+    enqueue_document_deletions(documents)
     db.session.commit()
-    flash(f'Competition "{competition.name}" has been deleted (including associated applications and files)', 'success')
+    kick_cleanup_worker()
+    invalidate_dashboard_stats()
+    bump_catalogue_version()
+    flash(f'Competition "{competition_name}" has been deleted (including associated applications and files)', 'success')
     return redirect(url_for('admin.competition_list'))
 
 
+def _application_search_page():
+    """按状态 / 关键词 / 赛事 / 提交日期筛选并游标分页；返回 (applications, next_cursor, status, filters, per_page, cursor)"""
+    status = request.args.get('status', 'all')
+    filters = application_filters(request.args)
+    per_page = get_page_size(request.args, current_app.config['APPLICATIONS_PER_PAGE'],
+                             current_app.config['APPLICATIONS_MAX_PER_PAGE'])
+    cursor = decode_cursor(request.args.get('cursor'))
+
+    # join 的同时填充 user / competition，避免模板逐行触发懒加载查询
+    query = Application.query.join(Application.user).join(Application.competition).options(
+        contains_eager(Application.user),
+        contains_eager(Application.competition)
+    )
+    try:
+        query = search_applications(query, filters, status if status in APPLICATION_STATUSES else None)
+    except ValueError:
+        abort(400, description='Dates must be in YYYY-MM-DD format')
+    applications, next_cursor = keyset_page(query, Application.submission_date, Application.id, cursor, per_page,
+                                            descending=True)
+    return applications, next_cursor, status, filters, per_page, cursor
+
+
 @admin_bp.route('/applications', endpoint='application_list')  # 显式指定 endpoint
 @login_required
 @admin_required
 def application_list():
-    """参赛申请管理列表"""
-    status = request.args.get('status', 'all')
-    query = Application.query.join(User).join(Competition)  # 先join User，再join Competition
-    if status == 'pending':
-        applications = query.filter(Application.status =='pending').order_by(Application.submission_date.desc()).all()
-    elif status == 'approved':
-        applications = query.filter(Application.status =='approved').order_by(Application.submission_date.desc()).all()
-    elif status == 'rejected':
-        applications = query.filter(Application.status =='rejected').order_by(Application.submission_date.desc()).all()
-    else:
-        applications = query.order_by(Application.submission_date.desc()).all()
+    """参赛申请管理列表（搜索 + 游标分页）"""
+    applications, next_cursor, status, filters, per_page, cursor = _application_search_page()
+    bulk_form = BulkReviewForm(current_filter=status)
+    if filters:
+        # “当前视图全部”只按状态筛选，搜索结果下仅允许批量处理勾选的申请
+        bulk_form.scope.choices = [choice for choice in bulk_form.scope.choices if choice[0] == 'selected']
     return render_template('admin/application_list.html', title='Application Management', applications=applications,
-                           current_status=status)
+                           current_status=status, per_page=per_page, next_cursor=next_cursor,
+                           is_first_page=cursor is None, bulk_form=bulk_form, filters=filters)
+
+
+@admin_bp.route('/applications/search', endpoint='search_applications')  # 显式指定 endpoint
+@login_required
+@admin_required
+def search_applications_json():
+    """参赛申请搜索（JSON，参数同申请列表）"""
+    applications, next_cursor, status, filters, per_page, cursor = _application_search_page()
+    return jsonify(items=[{
+        'id': application.id,
+        'status': application.status,
+        'submission_date': application.submission_date.isoformat(),
+        'team_name': application.team_name,
+        'user': {'id': application.user.id, 'username': application.user.username, 'email': application.user.email},
+        'competition': {'id': application.competition.id, 'name': application.competition.name},
+    } for application in applications], next_cursor=next_cursor)
+
+
+@admin_bp.route('/applications/bulk-review', methods=['POST'], endpoint='bulk_review')  # 显式指定 endpoint
+@login_required
+@admin_required
+def bulk_review_applications():
+    """批量审核参赛申请（单事务、单次 UPDATE ... WHERE id IN (...)）"""
+    form = BulkReviewForm()
+    wants_json = request.accept_mimetypes.best == 'application/json'
+    filter_status = form.current_filter.data or 'all'
+    if not form.validate_on_submit():
+        if wants_json:
+            return jsonify(errors=form.errors), 400
+        flash('Invalid bulk review request', 'danger')
+        return redirect(url_for('admin.application_list', status=filter_status))
+
+    if form.scope.data == 'filter':
+        outcomes, reviewed_at = bulk_review(form.status.data, form.notes.data.strip(), filter_status=filter_status)
+    else:
+        ids = request.form.getlist('application_ids', type=int)
+        if not ids:
+            if wants_json:
+                return jsonify(errors={'application_ids': ['No applications selected']}), 400
+            flash('Please select at least one application', 'warning')
+            return redirect(url_for('admin.application_list', status=filter_status))
+        outcomes, reviewed_at = bulk_review(form.status.data, form.notes.data.strip(), application_ids=ids)
+    invalidate_dashboard_stats()
+
+    summary = {outcome: 0 for outcome in ('updated', 'unchanged', 'not_found')}
+    for outcome in outcomes.values():
+        summary[outcome] += 1
+    if wants_json:
+        return jsonify(status=form.status.data, reviewed_at=reviewed_at.isoformat(), summary=summary,
+                       outcomes={str(app_id): outcome for app_id, outcome in outcomes.items()})
+    flash(f'Bulk review: {summary["updated"]} set to "{form.status.data}", {summary["unchanged"]} unchanged, '
+          f'{summary["not_found"]} not found', 'success' if summary['updated'] else 'info')
+    return redirect(url_for('admin.application_list', status=filter_status))
+
+
+@admin_bp.route('/applications/export', endpoint='export_applications')  # 显式指定 endpoint
+@login_required
+@admin_required
+def export_applications():
+    """导出参赛申请（CSV / JSON Lines，流式输出）"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        abort(400, description='Unsupported export format')
+    status = request.args.get('status')
+    try:
+        filters = dict(
+            competition_id=request.args.get('competition_id', type=int),
+            status=status if status in APPLICATION_STATUSES else None,
+            submitted_from=parse_date(request.args.get('from')),
+            submitted_to=parse_date(request.args.get('to')),
+        )
+    except ValueError:
+        abort(400, description='Dates must be in YYYY-MM-DD format')
+    filename = f'applications-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}'
+    return Response(
+        stream_with_context(generate_export(export_format, **filters)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@admin_bp.route('/applications/<int:app_id>/file', endpoint='download_application_file')  # 显式指定 endpoint
+@login_required
+@admin_required
+def download_application_file(app_id):
+    """下载申请附件（仅管理员）"""
+    application = Application.query.get_or_404(app_id, description='This application does not exist')
+    return send_document(application)
 
 
 @admin_bp.route('/applications/<int:app_id>/review', methods=['GET', 'POST'],
@@ -167,10 +285,25 @@ def review_application(app_id):
     application = Application.query.get_or_404(app_id, description='This application does not exist')
     form = ApplicationReviewForm(obj=application)
     if form.validate_on_submit():
+        old_status = application.status
         application.status = form.status.data
         application.notes = form.notes.data.strip()
         application.approved_at = datetime.utcnow()
+        record_status_changes([(application.competition_id, old_status, application.status)])
         db.session.commit()
+        invalidate_dashboard_stats()
+        if old_status != application.status and application.competition.capacity is not None:
+            bump_catalogue_version()  # 名额变化会显示在赛事目录中
         flash(f'Application review status updated to "{application.status}"', 'success')
         return redirect(url_for('admin.application_list', status=application.status))
-    return render_template('admin/review_application.html', title='Review Application', form=form, application=application)
\ No newline at end of file
+    return render_template('admin/review_application.html', title='Review Application', form=form, application=application)
+
+@admin_bp.route('/metrics', endpoint='metrics')  # 显式指定 endpoint
+def metrics():
+    """Prometheus 指标（管理员会话或 Authorization: Bearer <METRICS_TOKEN>）"""
+    token = current_app.config['METRICS_TOKEN']
+    supplied = request.headers.get('Authorization', '')
+    authorised = bool(token) and hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode())
+    if not authorised and not (current_user.is_authenticated and current_user.is_admin):
+        abort(403)
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
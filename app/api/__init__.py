@@ -0,0 +1,6 @@
+from flask import Blueprint
+
+# 创建只读 JSON API 蓝图（/api/v1）
+api_bp = Blueprint('api', __name__)
+
+from app.api import routes
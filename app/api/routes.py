@@ -0,0 +1,116 @@
+import hashlib
+from functools import wraps
+from flask import jsonify, request, current_app, abort
+from flask_login import current_user
+from sqlalchemy.orm import contains_eager
+from werkzeug.exceptions import HTTPException
+from app.api import api_bp
+from app.admin.routes import APPLICATION_STATUSES
+from app.api.serializers import COMPETITION_FIELDS, APPLICATION_FIELDS, parse_fields, serialize
+from app.models.competition import Competition
+from app.models.application import Application
+from app.services.pagination import decode_cursor, get_page_size, keyset_page
+from app.services.search import competition_filters, search_competitions
+
+
+def api_login_required(f):
+    """Like login_required, but answers 401 JSON instead of redirecting to the login page"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated:
+            abort(401, description='Authentication required')
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+@api_bp.errorhandler(HTTPException)
+def handle_http_error(error):
+    """API 错误统一返回 JSON"""
+    response = jsonify(error=error.name, message=error.description)
+    response.status_code = error.code
+    return response
+
+
+def _fields(available):
+    try:
+        return parse_fields(request.args.get('fields'), available)
+    except ValueError as error:
+        abort(400, description=str(error))
+
+
+def _page_size():
+    return get_page_size(request.args, current_app.config['API_PER_PAGE'], current_app.config['API_MAX_PER_PAGE'])
+
+
+def _conditional_json(payload, private=False):
+    """JSON response with a strong ETag over the exact body; answers 304 when If-None-Match matches"""
+    response = jsonify(payload)
+    response.set_etag(hashlib.sha256(response.get_data()).hexdigest())
+    response.cache_control.no_cache = True  # 客户端可缓存，但每次用 If-None-Match 重新验证
+    if private:
+        response.cache_control.private = True
+        response.vary.add('Cookie')
+    else:
+        response.cache_control.public = True
+    return response.make_conditional(request)
+
+
+@api_bp.route('/competitions', endpoint='competitions')
+def list_competitions():
+    """赛事列表（支持 fields、游标分页及与目录页相同的搜索参数）"""
+    fields = _fields(COMPETITION_FIELDS)
+    try:
+        query = search_competitions(competition_filters(request.args))
+    except ValueError:
+        abort(400, description='Dates must be in YYYY-MM-DD format')
+    competitions, next_cursor = keyset_page(query, Competition.start_date, Competition.id,
+                                            decode_cursor(request.args.get('cursor')), _page_size())
+    return _conditional_json({
+        'items': [serialize(comp, COMPETITION_FIELDS, fields) for comp in competitions],
+        'next_cursor': next_cursor,
+    })
+
+
+@api_bp.route('/competitions/<int:comp_id>', endpoint='competition')
+def get_competition(comp_id):
+    """单个赛事"""
+    fields = _fields(COMPETITION_FIELDS)
+    competition = Competition.query.get_or_404(comp_id, description='This competition does not exist')
+    return _conditional_json(serialize(competition, COMPETITION_FIELDS, fields))
+
+
+def _my_applications_query():
+    # join 的同时填充 competition，序列化时不再逐行查询
+    return Application.query.filter(Application.user_id == current_user.id).join(
+        Application.competition).options(contains_eager(Application.competition))
+
+
+@api_bp.route('/me/applications', endpoint='my_applications')
+@api_login_required
+def list_my_applications():
+    """当前用户的参赛申请（按提交时间倒序游标分页，可按 status 过滤）"""
+    fields = _fields(APPLICATION_FIELDS)
+    query = _my_applications_query()
+    status = request.args.get('status')
+    if status:
+        if status not in APPLICATION_STATUSES:
+            abort(400, description=f'status must be one of: {", ".join(APPLICATION_STATUSES)}')
+        query = query.filter(Application.status == status)
+    applications, next_cursor = keyset_page(query, Application.submission_date, Application.id,
+                                            decode_cursor(request.args.get('cursor')), _page_size(),
+                                            descending=True)
+    return _conditional_json({
+        'items': [serialize(application, APPLICATION_FIELDS, fields) for application in applications],
+        'next_cursor': next_cursor,
+    }, private=True)
+
+
+@api_bp.route('/me/applications/<int:app_id>', endpoint='my_application')
+@api_login_required
+def get_my_application(app_id):
+    """当前用户的单个参赛申请（轮询审核状态时配合 If-None-Match 使用）"""
+    fields = _fields(APPLICATION_FIELDS)
+    application = _my_applications_query().filter(Application.id == app_id).first_or_404(
+        description='This application does not exist')
+    return _conditional_json(serialize(application, APPLICATION_FIELDS, fields), private=True)
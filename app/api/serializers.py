@@ -0,0 +1,52 @@
+"""
+Field-selectable JSON serializers for the read-only API.
+Each model has a mapping of public field name -> accessor; clients pick a subset with ?fields=a,b,c.
+"""
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+COMPETITION_FIELDS = {
+    'id': lambda comp: comp.id,
+    'name': lambda comp: comp.name,
+    'description': lambda comp: comp.description,
+    'category': lambda comp: comp.category,
+    'start_date': lambda comp: _iso(comp.start_date),
+    'application_deadline': lambda comp: _iso(comp.application_deadline),
+    'is_open': lambda comp: comp.is_open_for_application,
+    'capacity': lambda comp: comp.capacity,
+    'places_left': lambda comp: comp.places_left,
+    'updated_at': lambda comp: _iso(comp.updated_at),
+}
+
+APPLICATION_FIELDS = {
+    'id': lambda app: app.id,
+    'status': lambda app: app.status,
+    'team_name': lambda app: app.team_name,
+    'notes': lambda app: app.notes,
+    'document_filename': lambda app: app.document_filename,
+    'submission_date': lambda app: _iso(app.submission_date),
+    'approved_at': lambda app: _iso(app.approved_at),
+    'competition': lambda app: {
+        'id': app.competition.id,
+        'name': app.competition.name,
+        'start_date': _iso(app.competition.start_date),
+    },
+}
+
+
+def parse_fields(raw, available):
+    """Validate a comma-separated ?fields= value against the available fields; None/empty selects all"""
+    if not raw:
+        return tuple(available)
+    fields = tuple(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ValueError(f'Unknown field(s): {", ".join(unknown)}. Available: {", ".join(available)}')
+    return fields
+
+
+def serialize(obj, accessors, fields):
+    return {field: accessors[field](obj) for field in fields}
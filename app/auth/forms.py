@@ -1,7 +1,9 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField, BooleanField
-from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError
+from wtforms.validators import DataRequired, Length, Email, EqualTo
+from sqlalchemy import or_
 from app.models.user import User
+from app.services.availability import USERNAME_TAKEN, EMAIL_TAKEN
 
 class RegistrationForm(FlaskForm):
     username = StringField('Username',
@@ -23,17 +25,21 @@ class RegistrationForm(FlaskForm):
     )
     submit = SubmitField('Sign Up')
 
-    # Username duplication validation
-    def validate_username(self, username):
-        user = User.query.filter_by(username=username.data).first()
-        if user:
-            raise ValidationError('This username is already taken. Please choose another one.')
-
-    # Email duplication validation
-    def validate_email(self, email):
-        user = User.query.filter_by(email=email.data).first()
-        if user:
-            raise ValidationError('This email is already registered. Please use another one.')
+    # Username/email duplication validation: one query for both fields
+    def validate(self, extra_validators=None):
+        valid = super().validate(extra_validators)
+        username = None if self.username.errors else self.username.data
+        email = None if self.email.errors else self.email.data
+        criteria = [column == value for column, value in ((User.username, username), (User.email, email)) if value]
+        if criteria:
+            for taken_username, taken_email in User.query.with_entities(User.username, User.email).filter(or_(*criteria)):
+                if username and taken_username == username and USERNAME_TAKEN not in self.username.errors:
+                    self.username.errors.append(USERNAME_TAKEN)
+                    valid = False
+                if email and taken_email == email and EMAIL_TAKEN not in self.email.errors:
+                    self.email.errors.append(EMAIL_TAKEN)
+                    valid = False
+        return valid
 
 class LoginForm(FlaskForm):
     email = StringField('Email',
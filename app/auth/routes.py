@@ -1,9 +1,26 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, jsonify, make_response
 from flask_login import login_user, logout_user, login_required, current_user
 from app.auth import auth_bp
 from app.auth.forms import RegistrationForm, LoginForm, DeleteAccountForm
 from app.models.user import User
+from app.models.application import Application
+from app.services.cleanup import enqueue_document_deletions, kick_cleanup_worker
+from app.services.availability import is_taken, USERNAME_TAKEN, EMAIL_TAKEN
+from app.services.counters import release_applications, refresh_catalogue_if_limited
+from app.services.identity import invalidate_identity
+from app.services.passwords import password_needs_rehash
+from app.services.ratelimit import check_rate_limits
+from app.services.stats import invalidate_dashboard_stats
 from app import db
+from datetime import datetime, timedelta
+
+
+def _too_many_attempts(template, title, form, retry_after):
+    """Re-render the form with a 429 status and Retry-After"""
+    flash(f'Too many attempts. Please wait {retry_after} seconds and try again', 'danger')
+    response = make_response(render_template(template, title=title, form=form), 429)
+    response.headers['Retry-After'] = str(retry_after)
+    return response
 
 
 @auth_bp.route('/register', methods=['GET', 'POST'])
@@ -14,6 +31,10 @@ def register():
 
     form = RegistrationForm()
     if form.validate_on_submit():
+        # Throttle per client IP before the password is hashed (bcrypt)
+        retry_after = check_rate_limits(('register_ip', request.remote_addr))
+        if retry_after:
+            return _too_many_attempts('auth/register.html', 'Sign Up', form, retry_after)
         # Create new user
         user = User(
             username=form.username.data,
@@ -23,6 +44,7 @@ def register():
         )
         db.session.add(user)
         db.session.commit()
+        invalidate_dashboard_stats()
 
         flash('Registration successful! Please log in', 'success')
         return redirect(url_for('auth.login'))
@@ -30,6 +52,29 @@ def register():
     return render_template('auth/register.html', title='Sign Up', form=form)
 
 
+@auth_bp.route('/availability')
+def availability():
+    """Inline registration check: is ?username= or ?email= valid and still free (JSON)"""
+    field = 'username' if 'username' in request.args else 'email' if 'email' in request.args else None
+    if field is None:
+        return jsonify(error='Pass username or email'), 400
+    retry_after = check_rate_limits(('availability_ip', request.remote_addr))
+    if retry_after:
+        return jsonify(error='Too many requests'), 429, {'Retry-After': str(retry_after)}
+    # 复用注册表单的字段校验规则与提示信息
+    form = RegistrationForm(formdata=request.args, meta={'csrf': False})
+    form_field = form[field]
+    if not form_field.validate(form):
+        result = {'field': field, 'available': False, 'message': form_field.errors[0]}
+    elif is_taken(field, form_field.data):
+        result = {'field': field, 'available': False, 'message': USERNAME_TAKEN if field == 'username' else EMAIL_TAKEN}
+    else:
+        result = {'field': field, 'available': True, 'message': None}
+    response = jsonify(result)
+    response.cache_control.no_store = True
+    return response
+
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """User Login"""
@@ -38,8 +83,22 @@ def login():
 
     form = LoginForm()
     if form.validate_on_submit():
+        # Throttle per client IP and per account before any bcrypt verification
+        retry_after = check_rate_limits(('login_ip', request.remote_addr),
+                                        ('login_account', form.email.data.strip().lower()))
+        if retry_after:
+            return _too_many_attempts('auth/login.html', 'Login', form, retry_after)
         user = User.query.filter_by(email=form.email.data).first()
         if user and user.check_password(form.password.data):
+            # Transparently upgrade hashes made with an old BCRYPT_LOG_ROUNDS setting
+            if password_needs_rehash(user.password_hash):
+                user.password = form.password.data
+            # Activity stamp for the retention purge (written at most once a day)
+            now = datetime.utcnow()
+            if user.last_login_at is None or now - user.last_login_at > timedelta(days=1):
+                user.last_login_at = now
+            if db.session.dirty:
+                db.session.commit()
             # Log in user (7 days remember me if checked)
             login_user(user, remember=form.remember.data, duration=3600 * 24 * 7)
             # Redirect to previously visited page (or competition list if none)
@@ -75,9 +134,21 @@ def delete_account():
     if form.validate_on_submit():
         # Verify password
         if current_user.check_password(form.password.data):
-            # Delete user (cascades to associated applications)
-            db.session.delete(current_user)
+            # Delete the user's applications and the user with set-based deletes; files are removed in the background
+            user_id = current_user.id
+            documents = db.session.query(
+                Application.user_id, Application.document_filename, Application.document_sha256
+            ).filter(Application.user_id == user_id, Application.document_filename.isnot(None)).all()
+            touched = release_applications(Application.user_id == user_id)
+            Application.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            enqueue_document_deletions(documents)
             db.session.commit()
+            logout_user()
+            invalidate_identity(user_id)
+            kick_cleanup_worker()
+            invalidate_dashboard_stats()
+            refresh_catalogue_if_limited(touched)
             flash('Account has been permanently deleted, and all associated data has been cleared', 'success')
             return redirect(url_for('competitions.list'))
         else:
@@ -0,0 +1,148 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.migrations import upgrade_database, MigrationError
+from app.services.bootstrap import bootstrap_database
+from app.services.assets import build_assets
+from app.services.cleanup import drain_deletion_queue
+from app.services.retention import count_expired, purge_expired, retention_cutoff
+from app.services.export import EXPORT_FORMATS, generate_export
+from app.services.importer import IMPORT_KINDS, import_file, write_error_report
+from app.services.stats import invalidate_dashboard_stats
+from app.services.catalogue import bump_catalogue_version
+from app.services.counters import repair_counters
+
+
+@click.command('upgrade-db')
+@with_appcontext
+def upgrade_db_command():
+    """Upgrade an existing database in place (new tables, indexes and constraints)"""
+    try:
+        changes = upgrade_database()
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+    if changes:
+        for kind, name in changes:
+            click.echo(f'Added {kind} {name}')
+    else:
+        click.echo('Database schema is already up to date')
+
+
+@click.command('bootstrap')
+@click.option('--no-samples', is_flag=True, help='Do not add the sample competitions')
+@with_appcontext
+def bootstrap_command(no_samples):
+    """Create/upgrade the schema and seed the admin account and sample competitions (idempotent)"""
+    try:
+        messages = bootstrap_database(with_samples=not no_samples)
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+    for message in messages:
+        click.echo(message)
+    click.echo('Bootstrap complete' if messages else 'Nothing to do: database already bootstrapped')
+
+
+@click.command('cleanup-files')
+@with_appcontext
+def cleanup_files_command():
+    """Process the queued file deletions now (also recovers jobs left by a restart)"""
+    removed, failed = drain_deletion_queue()
+    click.echo(f'Removed {removed} files, {failed} failed (will be retried)')
+
+
+@click.command('export-applications')
+@click.option('--format', 'export_format', type=click.Choice(sorted(EXPORT_FORMATS)), default='csv', show_default=True)
+@click.option('--competition-id', type=int, help='Only applications for this competition')
+@click.option('--status', type=click.Choice(['pending', 'approved', 'rejected']), help='Only applications in this status')
+@click.option('--from', 'submitted_from', type=click.DateTime(), help='Submitted on or after this date')
+@click.option('--to', 'submitted_to', type=click.DateTime(), help='Submitted before this date')
+@click.option('--output', type=click.File('w', encoding='utf-8'), default='-', help='Output file (default: stdout)')
+@with_appcontext
+def export_applications_command(export_format, competition_id, status, submitted_from, submitted_to, output):
+    """Stream applications (joined with user and competition) as CSV or JSON Lines"""
+    for chunk in generate_export(export_format, competition_id=competition_id, status=status,
+                                 submitted_from=submitted_from, submitted_to=submitted_to):
+        output.write(chunk)
+
+
+@click.command('import-data')
+@click.argument('kind', type=click.Choice(IMPORT_KINDS))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', type=click.IntRange(1), default=1000, show_default=True, help='Rows per validation batch / transaction')
+@click.option('--workers', type=click.IntRange(1), help='Parallel password hashing threads (default: CPU count)')
+@click.option('--dry-run', is_flag=True, help='Validate only, insert nothing')
+@click.option('--errors', 'error_report', type=click.Path(dir_okay=False, writable=True), help='Write per-row errors to this CSV file')
+@with_appcontext
+def import_data_command(kind, path, batch_size, workers, dry_run, error_report):
+    """Bulk import competitions, users or applications from a CSV / JSON Lines file"""
+    result = import_file(kind, path, batch_size=batch_size, dry_run=dry_run, workers=workers)
+    if not dry_run and result.imported:
+        invalidate_dashboard_stats()
+        bump_catalogue_version()
+    verb = 'Validated' if dry_run else 'Imported'
+    click.echo(f'{verb} {result.imported} {kind}, {result.failed} rejected')
+    if error_report:
+        write_error_report(result, error_report)
+        click.echo(f'Error report written to {error_report}')
+    else:
+        for line, message in result.errors[:20]:
+            click.echo(f'  line {line}: {message}', err=True)
+        if len(result.errors) > 20:
+            click.echo(f'  ... {len(result.errors) - 20} more (use --errors FILE for the full report)', err=True)
+
+
+@click.command('repair-counters')
+@with_appcontext
+def repair_counters_command():
+    """Recount the per-competition application counters from the applications table"""
+    repaired = repair_counters()
+    for comp_id, name, stored, actual in repaired:
+        click.echo(f'Competition {comp_id} ({name}): {stored} -> {actual}')
+    click.echo(f'Repaired {len(repaired)} competitions' if repaired else 'All counters are consistent')
+
+
+@click.command('purge-expired')
+@click.option('--batch-size', type=click.IntRange(1), help='Rows per transaction (default: RETENTION_BATCH_SIZE)')
+@click.option('--pause', type=click.FloatRange(0), help='Seconds to wait between batches (default: RETENTION_BATCH_PAUSE_MS)')
+@click.option('--dry-run', is_flag=True, help='Only count what would be purged')
+@with_appcontext
+def purge_expired_command(batch_size, pause, dry_run):
+    """Delete applications and inactive accounts older than DATA_RETENTION_PERIOD (batched, safe to interrupt and re-run)"""
+    cutoff = retention_cutoff()
+    if dry_run:
+        applications, users = count_expired(cutoff)
+        click.echo(f'Would purge {applications} applications and {users} users (cutoff {cutoff:%Y-%m-%d %H:%M})')
+        return
+
+    def report(result):
+        click.echo(f'  batch {result.batches}: {result.applications} applications, {result.users} users '
+                   f'({result.rate:.0f} rows/s)', err=True)
+
+    try:
+        result = purge_expired(cutoff, batch_size=batch_size, pause=pause, progress=report)
+    except KeyboardInterrupt:
+        raise click.ClickException('Interrupted: finished batches are committed, run the command again to resume')
+    removed, failed = drain_deletion_queue()
+    click.echo(f'Purged {result.applications} applications and {result.users} users in {result.batches} batches, '
+               f'{result.elapsed:.1f} s ({result.rate:.0f} rows/s); removed {removed} files, {failed} failed (will be retried)')
+
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Minify, fingerprint and precompress static assets into static/dist (re-run after editing them)"""
+    for name, fingerprinted, sizes in build_assets(current_app.static_folder):
+        details = ', '.join(f'{kind} {size}' for kind, size in sizes.items())
+        click.echo(f'{name} -> dist/{fingerprinted} ({details} bytes)')
+
+
+def register_commands(app):
+    """Attach the project's CLI commands to the Flask app"""
+    app.cli.add_command(upgrade_db_command)
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(cleanup_files_command)
+    app.cli.add_command(export_applications_command)
+    app.cli.add_command(import_data_command)
+    app.cli.add_command(repair_counters_command)
+    app.cli.add_command(purge_expired_command)
+    app.cli.add_command(build_assets_command)
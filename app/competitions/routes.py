@@ -1,27 +1,83 @@
-from flask import render_template, redirect, url_for, flash, request, current_app  # Import current_app
+from flask import render_template, redirect, url_for, flash, request, current_app, abort, jsonify
 from flask_login import login_required, current_user
 from app.competitions import comp_bp
 from app.competitions.forms import ApplicationForm
 from app.models.competition import Competition
 from app.models.application import Application
+from app.services.stats import invalidate_dashboard_stats
+from app.services.catalogue import cached_page, cache_page, catalogue_version, bump_catalogue_version
+from app.services.storage import send_document, store_upload
+from app.services.counters import reserve_place
+from app.services.applications import applied_competition_ids, forget_applied_competition_ids
+from app.services.pagination import decode_cursor, get_page_size, keyset_page
+from app.services.search import competition_filters, search_competitions, competition_categories
 from app import db
 from datetime import datetime
-import os
 from werkzeug.utils import secure_filename
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+
+def _competition_search_page():
+    """Filter competitions from the query string and fetch one (start_date, id) keyset page"""
+    filters = competition_filters(request.args)
+    per_page = get_page_size(request.args, current_app.config['COMPETITIONS_PER_PAGE'],
+                             current_app.config['COMPETITIONS_MAX_PER_PAGE'])
+    try:
+        query = search_competitions(filters)
+    except ValueError:
+        abort(400, description='Dates must be in YYYY-MM-DD format')
+    competitions, next_cursor = keyset_page(query, Competition.start_date, Competition.id,
+                                            decode_cursor(request.args.get('cursor')), per_page)
+    return competitions, next_cursor, filters, per_page
 
 
 @comp_bp.route('/')
 def list():
-    """Competition List Page"""
-    competitions = Competition.query.order_by(Competition.start_date).all()
-    return render_template('competitions/list.html', title='Competition List', competitions=competitions)
+    """Competition List Page (search, filters and cursor pagination)"""
+    # Only the unfiltered first page is cached; search results depend on the query string
+    searching = bool(request.args)
+    version = catalogue_version()
+    if not searching:
+        cached = cached_page('list')
+        if cached is not None:
+            return cached
+    competitions, next_cursor, filters, per_page = _competition_search_page()
+    html = render_template('competitions/list.html', title='Competition List', competitions=competitions,
+                           applied_ids=applied_competition_ids(), filters=filters, next_cursor=next_cursor,
+                           per_page=per_page, is_first_page=not request.args.get('cursor'),
+                           categories=competition_categories())
+    if searching:
+        return html
+    return cache_page(('list',), html, competitions, version)
+
+
+@comp_bp.route('/search')
+def search():
+    """Competition Search (JSON, same parameters as the list page)"""
+    competitions, next_cursor, filters, per_page = _competition_search_page()
+    return jsonify(items=[{
+        'id': competition.id,
+        'name': competition.name,
+        'category': competition.category,
+        'description': competition.description,
+        'start_date': competition.start_date.isoformat(),
+        'application_deadline': competition.application_deadline.isoformat(),
+        'is_open': competition.is_open_for_application,
+    } for competition in competitions], next_cursor=next_cursor)
 
 
 @comp_bp.route('/<int:comp_id>')
 def detail(comp_id):
     """Competition Detail Page"""
+    version = catalogue_version()
+    cached = cached_page('detail', comp_id)
+    if cached is not None:
+        return cached
     competition = Competition.query.get_or_404(comp_id, description='This competition does not exist')
-    return render_template('competitions/detail.html', title=competition.name, competition=competition)
+    html = render_template('competitions/detail.html', title=competition.name, competition=competition,
+                           has_applied=competition.id in applied_competition_ids())
+    return cache_page(('detail', comp_id), html, [competition], version)
 
 
 @comp_bp.route('/apply', methods=['GET', 'POST'])
@@ -29,9 +85,12 @@ def detail(comp_id):
 def apply():
     """Submit Competition Application"""
     form = ApplicationForm()
-    # Dynamically load open competitions (deadline not passed)
-    open_competitions = Competition.query.filter(Competition.application_deadline > datetime.utcnow()).order_by(
-        Competition.start_date).all()
+    # Dynamically load open competitions (deadline not passed, places left)
+    open_competitions = Competition.query.filter(
+        Competition.application_deadline > datetime.utcnow(),
+        or_(Competition.capacity.is_(None),
+            Competition.pending_count + Competition.approved_count < Competition.capacity)
+    ).order_by(Competition.start_date).all()
     form.competition_id.choices = [(comp.id, comp.name) for comp in open_competitions]
 
     if not open_competitions:
@@ -41,42 +100,49 @@ def apply():
     if form.validate_on_submit():
         comp_id = form.competition_id.data
         team_name = form.team_name.data.strip() or None
+        # Read before the commit, which expires every loaded competition
+        limited = any(comp.id == comp_id and comp.capacity is not None for comp in open_competitions)
 
-        # Check if user has already applied for this competition
-        existing_app = Application.query.filter_by(
-            user_id=current_user.id,
-            competition_id=comp_id
-        ).first()
-        if existing_app:
+        if comp_id in applied_competition_ids():
             flash('You have already submitted an application for this competition. No need to reapply', 'warning')
             return redirect(url_for('competitions.detail', comp_id=comp_id))
 
-        # Handle file upload (use current_app to get config instead of creating app instance directly)
-        document_filename = None
+        # Store the upload by content hash first (already hashed while it was streamed in); objects are
+        # deduplicated, so keeping it after a duplicate or full-capacity rejection costs nothing
+        document_filename = document_sha256 = document_size = None
         if form.document.data:
-            # Secure filename handling
-            filename = secure_filename(form.document.data.filename)
-            # Get upload folder config from current_app (avoid circular import)
-            upload_folder = current_app.config['UPLOAD_FOLDER']
-            # Create user-specific upload directory
-            user_upload_dir = os.path.join(upload_folder, str(current_user.id))
-            if not os.path.exists(user_upload_dir):
-                os.makedirs(user_upload_dir)
-            # Save file
-            file_path = os.path.join(user_upload_dir, filename)
-            form.document.data.save(file_path)
-            document_filename = filename
-
-        # Create competition application
+            document_filename = secure_filename(form.document.data.filename)
+            document_sha256, document_size = store_upload(form.document.data)
+
+        # Insert first and let the unique index reject duplicates (no SELECT-then-INSERT race)
         application = Application(
             user_id=current_user.id,
             competition_id=comp_id,
             team_name=team_name,
+            notes=form.notes.data.strip(),
             document_filename=document_filename,
-            notes=form.notes.data.strip()
+            document_sha256=document_sha256,
+            document_size=document_size
         )
         db.session.add(application)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            flash('You have already submitted an application for this competition. No need to reapply', 'warning')
+            return redirect(url_for('competitions.detail', comp_id=comp_id))
+
+        # Take a place with one conditional UPDATE; fails once the competition is full
+        if not reserve_place(comp_id):
+            db.session.rollback()
+            flash('Sorry, this competition has just reached its capacity', 'warning')
+            return redirect(url_for('competitions.detail', comp_id=comp_id))
+
         db.session.commit()
+        forget_applied_competition_ids()
+        invalidate_dashboard_stats()
+        if limited:
+            bump_catalogue_version()  # Places left are shown in the catalogue
 
         flash('Application submitted successfully! Please wait for admin review', 'success')
         return redirect(url_for('competitions.my_applications'))
@@ -102,3 +168,13 @@ def application_detail(app_id):
         id=app_id, user_id=current_user.id
     ).join(Competition).first_or_404(description='This application does not exist')
     return render_template('competitions/application_detail.html', title='Application Detail', application=application)
+
+
+@comp_bp.route('/application/<int:app_id>/document')
+@login_required
+def application_document(app_id):
+    """Download the document of one of the current user's applications"""
+    application = Application.query.filter_by(
+        id=app_id, user_id=current_user.id
+    ).first_or_404(description='This application does not exist')
+    return send_document(application)
@@ -0,0 +1,50 @@
+"""
+Engine configuration: per-backend engine options (pool, PostgreSQL statement timeout)
+and SQLite connection PRAGMAs.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from app import db
+
+# 连接池参数（内存 SQLite 使用 StaticPool，不接受这些参数）
+_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Run PRAGMA name=value for each configured pragma on a new DB-API connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def init_database(app):
+    """Bind Flask-SQLAlchemy with backend-appropriate engine options and connect-time PRAGMAs"""
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if _is_memory_sqlite(url):
+        for key in _POOL_OPTIONS:
+            options.pop(key, None)
+    timeout_ms = app.config.get('DB_STATEMENT_TIMEOUT_MS')
+    if url.get_backend_name() == 'postgresql' and timeout_ms:
+        # libpq 启动参数，对 psycopg2 / psycopg 均有效
+        connect_args = dict(options.get('connect_args') or {})
+        connect_args['options'] = f"{connect_args.get('options', '')} -c statement_timeout={int(timeout_ms)}".strip()
+        options['connect_args'] = connect_args
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    db.init_app(app)
+
+    if url.get_backend_name() == 'sqlite' and app.config.get('SQLITE_PRAGMAS'):
+        pragmas = dict(app.config['SQLITE_PRAGMAS'])
+        with app.app_context():
+            engine = db.engine  # 仅创建 Engine 对象，不会建立连接
+
+        @event.listens_for(engine, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            apply_sqlite_pragmas(dbapi_connection, pragmas)
@@ -0,0 +1,76 @@
+"""
+Lightweight, idempotent schema upgrades for existing databases (no Flask-Migrate required).
+Run with: flask upgrade-db
+"""
+from datetime import datetime
+from sqlalchemy import func, inspect, update
+from sqlalchemy.schema import CreateColumn
+from app import db
+
+
+class MigrationError(Exception):
+    """Raised when existing data prevents a schema upgrade"""
+
+
+def _duplicate_applications():
+    from app.models.application import Application
+    return db.session.query(
+        Application.competition_id, Application.user_id, func.count(Application.id)
+    ).group_by(
+        Application.competition_id, Application.user_id
+    ).having(func.count(Application.id) > 1).all()
+
+
+def add_missing_columns():
+    """ALTER TABLE ... ADD COLUMN for model columns missing from existing tables"""
+    inspector = inspect(db.engine)
+    added = []
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                    conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {ddl}')
+                    added.append(f'{table.name}.{column.name}')
+    return added
+
+
+def create_missing_indexes():
+    """Create every index declared on the models that the database does not have yet"""
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+                created.append(index.name)
+    return created
+
+
+def upgrade_database():
+    """Create missing tables, columns, indexes and search tables; returns a list of (kind, name) changes"""
+    db.create_all()
+    changes = [('column', name) for name in add_missing_columns()]
+    duplicates = _duplicate_applications()
+    if duplicates:
+        pairs = ', '.join(f'competition {comp_id}/user {user_id} (x{count})' for comp_id, user_id, count in duplicates)
+        raise MigrationError(f'Duplicate applications must be resolved before adding the unique index: {pairs}')
+    changes += [('index', name) for name in create_missing_indexes()]
+    from app.services.search import ensure_search_index
+    changes += [('search index', name) for name in ensure_search_index()]
+    if any(name.startswith('competitions.') and name.endswith('_count') for kind, name in changes if kind == 'column'):
+        # 新增的计数列默认为 0，需按现有申请回填
+        from app.services.counters import repair_counters
+        changes += [('counters for', f'competition {comp_id}') for comp_id, *_ in repair_counters()]
+    if ('column', 'users.last_login_at') in changes:
+        # 此前登录从未记录：现有账号的不活跃期从升级时开始计算，避免保留期清理误删
+        from app.models.user import User
+        with db.engine.begin() as conn:
+            stamped = conn.execute(update(User.__table__).where(User.__table__.c.last_login_at.is_(None))
+                                   .values(last_login_at=datetime.utcnow())).rowcount
+        changes.append(('last login stamp to', f'{stamped} existing users'))
+    return changes
@@ -3,12 +3,24 @@ from datetime import datetime
 
 class Application(db.Model):
     __tablename__ = 'applications'
+    __table_args__ = (
+        # 每位用户对同一赛事只能申请一次；同时服务于按赛事查询
+        db.Index('uq_applications_competition_user', 'competition_id', 'user_id', unique=True),
+        # 管理员按状态筛选 + 按提交时间排序（列表、仪表盘）
+        db.Index('ix_applications_status_submission_date', 'status', 'submission_date'),
+        # 用户“我的申请”按提交时间排序
+        db.Index('ix_applications_user_submission_date', 'user_id', 'submission_date'),
+        # 去重存储的引用计数查询
+        db.Index('ix_applications_document_sha256', 'document_sha256'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # Foreign key to User
     competition_id = db.Column(db.Integer, db.ForeignKey('competitions.id'), nullable=False)  # Foreign key to Competition
     team_name = db.Column(db.String(100), nullable=True)  # Team name (leave blank for individual)
     document_filename = db.Column(db.String(255), nullable=True)  # Uploaded file name
+    document_sha256 = db.Column(db.String(64), nullable=True)  # Content hash (content-addressed storage key)
+    document_size = db.Column(db.Integer, nullable=True)  # Uploaded file size in bytes
     notes = db.Column(db.Text, nullable=True)  # Additional notes
     status = db.Column(db.String(20), default='pending', nullable=False)  # pending/approved/rejected
     submission_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Submission time
@@ -8,8 +8,13 @@ class Competition(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(50), nullable=False)  # Individual/Team/Mixed
-    start_date = db.Column(db.DateTime, nullable=False)
+    start_date = db.Column(db.DateTime, nullable=False, index=True)
     application_deadline = db.Column(db.DateTime, nullable=False)
+    capacity = db.Column(db.Integer, nullable=True)  # Max pending + approved applications (None = unlimited)
+    # Denormalized application counters, maintained in the same transaction as each application change
+    pending_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    approved_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rejected_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -26,5 +31,20 @@ class Competition(db.Model):
     def is_open_for_application(self):
         return datetime.utcnow() < self.application_deadline
 
+    # Places taken (rejected applications free their place)
+    @property
+    def places_taken(self):
+        return (self.pending_count or 0) + (self.approved_count or 0)
+
+    @property
+    def places_left(self):
+        if self.capacity is None:
+            return None
+        return max(0, self.capacity - self.places_taken)
+
+    @property
+    def is_full(self):
+        return self.capacity is not None and self.places_taken >= self.capacity
+
     def __repr__(self):
         return f'<Competition {self.name}>'
\ No newline at end of file
@@ -0,0 +1,16 @@
+from app import db
+from datetime import datetime
+
+class FileDeletionJob(db.Model):
+    __tablename__ = 'file_deletion_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    path = db.Column(db.String(500), nullable=False)  # Absolute path of the file to remove
+    document_sha256 = db.Column(db.String(64), nullable=True)  # Set for content-addressed objects (re-checked before removal)
+    attempts = db.Column(db.Integer, default=0, nullable=False)  # Failed attempts so far
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)  # Retry backoff
+
+    def __repr__(self):
+        return f'<FileDeletionJob {self.id} {self.path} attempts={self.attempts}>'
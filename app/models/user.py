@@ -1,12 +1,13 @@
 from app import db, login_manager
 from datetime import datetime
 from flask_login import UserMixin
-from app import bcrypt
+from app.services.passwords import hash_password, verify_password
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Flask-Login required: Load user by ID"""
-    return User.query.get(int(user_id))
+    """Flask-Login required: Load user by ID (served from the identity cache when possible)"""
+    from app.services.identity import load_identity
+    return load_identity(int(user_id))
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -17,7 +18,8 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(60), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
     consent_given = db.Column(db.Boolean, nullable=False, default=False)  # GDPR consent
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_login_at = db.Column(db.DateTime, nullable=True, index=True)  # Retention: inactive accounts are purged
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # 双向关联：User ↔ Application
@@ -36,11 +38,11 @@ class User(UserMixin, db.Model):
     # Set password with automatic encryption
     @password.setter
     def password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = hash_password(password)
 
     # Verify password
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
     def __repr__(self):
         return f'<User {self.username} ({self.email})>'
\ No newline at end of file
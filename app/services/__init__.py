@@ -0,0 +1 @@
+# 业务服务层：跨蓝图复用的查询、缓存与后台任务
@@ -0,0 +1,19 @@
+from flask import g
+from flask_login import current_user
+from app import db
+from app.models.application import Application
+
+
+def applied_competition_ids():
+    """Set of competition IDs the current user has applied to, loaded with one query per request"""
+    if not current_user.is_authenticated:
+        return frozenset()
+    if 'applied_competition_ids' not in g:
+        rows = db.session.query(Application.competition_id).filter(Application.user_id == current_user.id)
+        g.applied_competition_ids = frozenset(comp_id for (comp_id,) in rows)
+    return g.applied_competition_ids
+
+
+def forget_applied_competition_ids():
+    """Drop the per-request set after the current user's applications change"""
+    g.pop('applied_competition_ids', None)
@@ -0,0 +1,146 @@
+"""
+Static asset pipeline.
+'flask build-assets' minifies CSS/JS, writes content-hashed copies to static/dist/ together
+with .gz (and .br when the optional brotli package is installed) variants and a manifest.
+url_for('static', filename=...) then points at the fingerprinted copy, which is served with a
+one-year immutable Cache-Control and the best precompressed variant the client accepts.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from flask import abort, current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # 可选依赖：未安装时只生成 .gz
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+ASSET_EXTENSIONS = ('.css', '.js', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico', '.webp', '.woff2')
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg')
+SKIP_DIRS = (DIST_DIR, 'uploads', 'docs')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace"""
+    css = _CSS_COMMENT.sub('', source)
+    css = _CSS_SPACE.sub(' ', css)
+    css = _CSS_PUNCTUATION.sub(r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """Conservative: drop indentation, blank lines and whole-line // comments; line breaks are kept for ASI"""
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//')) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def _source_files(static_folder):
+    for root, dirs, files in os.walk(static_folder):
+        if os.path.relpath(root, static_folder) == '.':
+            dirs[:] = [name for name in dirs if name not in SKIP_DIRS]
+        for name in sorted(files):
+            if name.lower().endswith(ASSET_EXTENSIONS):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, static_folder).replace(os.sep, '/'), path
+
+
+def build_assets(static_folder):
+    """Build static/dist and its manifest; returns [(source, fingerprinted name, sizes dict)]"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist, exist_ok=True)
+    manifest, report = {}, []
+    for name, path in _source_files(static_folder):
+        with open(path, 'rb') as f:
+            data = f.read()
+        sizes = {'source': len(data)}
+        stem, ext = os.path.splitext(name)
+        minify = MINIFIERS.get(ext.lower())
+        if minify:
+            data = minify(data.decode('utf-8')).encode('utf-8')
+            sizes['minified'] = len(data)
+        fingerprinted = f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+        target = os.path.join(dist, fingerprinted)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        if ext.lower() in COMPRESSIBLE_EXTENSIONS:
+            variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data, quality=11)
+            for suffix, compressed in variants.items():
+                if len(compressed) < len(data):
+                    with open(target + suffix, 'wb') as f:
+                        f.write(compressed)
+                    sizes[suffix.lstrip('.')] = len(compressed)
+        manifest[name] = fingerprinted
+        report.append((name, fingerprinted, sizes))
+    with open(os.path.join(dist, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    current_app.extensions['asset_manifest'] = manifest
+    return report
+
+
+def load_manifest(app):
+    """Read static/dist/manifest.json (an empty mapping when assets have not been built)"""
+    try:
+        with open(os.path.join(app.static_folder, DIST_DIR, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _fingerprint_url(endpoint, values):
+    # url_for('static', filename='css/base.css') -> dist/css/base.<hash>.css（调试模式下保持原文件）
+    if endpoint != 'static' or current_app.debug:
+        return
+    fingerprinted = current_app.extensions['asset_manifest'].get(values.get('filename'))
+    if fingerprinted:
+        values['filename'] = f'{DIST_DIR}/{fingerprinted}'
+
+
+def _accepted_variant(path):
+    accepted = request.accept_encodings
+    for suffix, encoding in (('.br', 'br'), ('.gz', 'gzip')):
+        if accepted[encoding] and os.path.isfile(path + suffix):
+            return suffix, encoding
+    return '', None
+
+
+def serve_static(filename):
+    """Static view: fingerprinted files are immutable and served precompressed when possible"""
+    static_folder = current_app.static_folder
+    if not filename.startswith(DIST_DIR + '/'):
+        return current_app.send_static_file(filename)
+    path = safe_join(static_folder, filename)
+    if path is None:
+        abort(404)
+    suffix, encoding = _accepted_variant(path)
+    response = send_from_directory(static_folder, filename + suffix, mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    """Load the manifest and route url_for('static') / the static view through the pipeline"""
+    app.extensions['asset_manifest'] = load_manifest(app)
+    app.url_defaults(_fingerprint_url)
+    app.view_functions['static'] = serve_static
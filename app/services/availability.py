@@ -0,0 +1,17 @@
+"""
+Username / email availability for the registration form.
+Every answer is one lookup on the unique index, so it is exact across processes at the
+moment of the check; the registration POST still re-checks (and the index enforces) it.
+"""
+from sqlalchemy import select
+from app import db
+from app.models.user import User
+
+USERNAME_TAKEN = 'This username is already taken. Please choose another one.'
+EMAIL_TAKEN = 'This email is already registered. Please use another one.'
+
+
+def is_taken(field, value):
+    """True when a user already has this username / email ('username' or 'email')"""
+    column = User.username if field == 'username' else User.email
+    return db.session.scalar(select(User.id).where(column == value).limit(1)) is not None
@@ -0,0 +1,59 @@
+"""
+Explicit, idempotent database bootstrap: schema upgrade + default admin + sample competitions.
+Run with: flask bootstrap  (never runs implicitly at startup unless AUTO_BOOTSTRAP is set)
+"""
+from datetime import datetime, timedelta
+from app import db
+from app.migrations import upgrade_database
+from app.models.user import User
+from app.models.competition import Competition
+
+DEFAULT_ADMIN = {'username': 'admin', 'email': 'admin@phg.com', 'password': 'Admin123!'}
+
+
+def sample_competitions(now=None):
+    """Three demo competitions scheduled relative to now"""
+    now = now or datetime.utcnow()
+    return [
+        Competition(
+            name="2025 Highland Dance Competition",
+            category="Individual",
+            start_date=now + timedelta(days=30),
+            application_deadline=now + timedelta(days=15),
+            description="Traditional Scottish Highland dance competition, divided into solo jazz dance and duet tap dance categories. Contestants must submit a dance video as application material. Judges will score based on movement standardization and sense of rhythm."
+        ),
+        Competition(
+            name="Bagpipe Ensemble Competition",
+            category="Team",
+            start_date=now + timedelta(days=45),
+            application_deadline=now + timedelta(days=20),
+            description="Team bagpipe performance competition. Each team consists of 3-5 members. Contestants must perform the designated traditional Scottish tune 'Scotland the Brave' with a performance duration of 5 minutes. Scoring criteria include tone, coordination, and expressiveness."
+        ),
+        Competition(
+            name="Highland Weightlifting Challenge",
+            category="Mixed",
+            start_date=now + timedelta(days=60),
+            application_deadline=now + timedelta(days=30),
+            description="Traditional Highland strength competition, divided into individual and team relay categories. The weight for the individual category is 50kg, and the total relay weight for the team category (3 members) is 120kg. Rankings are determined by completion time."
+        )
+    ]
+
+
+def bootstrap_database(with_samples=True):
+    """Bring the schema up to date and seed the admin account / sample competitions if absent"""
+    messages = [f'Schema: added {kind} {name}' for kind, name in upgrade_database()]
+    if not db.session.query(User.query.filter_by(username=DEFAULT_ADMIN['username']).exists()).scalar():
+        db.session.add(User(
+            username=DEFAULT_ADMIN['username'],
+            email=DEFAULT_ADMIN['email'],
+            password=DEFAULT_ADMIN['password'],  # 复用 User 模型的 password setter 自动加密
+            consent_given=True,
+            is_admin=True
+        ))
+        messages.append(f'Created admin account: {DEFAULT_ADMIN["username"]} / {DEFAULT_ADMIN["password"]} / {DEFAULT_ADMIN["email"]}')
+    if with_samples and not db.session.query(Competition.query.exists()).scalar():
+        competitions = sample_competitions()
+        db.session.add_all(competitions)
+        messages.append(f'Added {len(competitions)} sample competitions')
+    db.session.commit()
+    return messages
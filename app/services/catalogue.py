@@ -0,0 +1,93 @@
+"""
+Response cache for the public competition catalogue (list/detail pages).
+Only anonymous responses are cached; entries are keyed on a catalogue version that
+admin edits bump, and expire no later than the next application deadline so the
+open/closed badge never goes stale. The cache and its version are per process: an edit
+clears the worker that handled it at once, while other workers may keep serving the old
+page for up to CATALOGUE_CACHE_TTL seconds.
+"""
+import hashlib
+import threading
+from datetime import datetime
+from flask import current_app, request, session, Response
+from flask_login import current_user
+from app.services.cache import TTLCache
+
+_page_cache = TTLCache(maxsize=256)
+_version_lock = threading.Lock()
+_catalogue_version = 0
+
+
+def bump_catalogue_version():
+    """Invalidate every cached catalogue page; call after committing a competition change"""
+    global _catalogue_version
+    with _version_lock:
+        _catalogue_version += 1
+        _page_cache.clear()
+
+
+def catalogue_version():
+    """Current catalogue version; read it before querying and pass it to cache_page"""
+    return _catalogue_version
+
+
+def _is_cacheable():
+    # 登录用户页面含个人信息；待显示的 flash 消息也会写入页面
+    return request.method in ('GET', 'HEAD') and not current_user.is_authenticated and '_flashes' not in session
+
+
+def _last_modified(competitions, now):
+    """Latest of the competitions' updated_at and the most recent deadline that has already passed"""
+    stamps = [comp.updated_at or comp.created_at for comp in competitions]
+    stamps += [comp.application_deadline for comp in competitions if comp.application_deadline <= now]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def _seconds_until_next_deadline(competitions, now):
+    upcoming = [comp.application_deadline for comp in competitions if comp.application_deadline > now]
+    if not upcoming:
+        return None
+    return (min(upcoming) - now).total_seconds()
+
+
+def _conditional_response(entry):
+    body, etag, last_modified = entry
+    response = Response(body, mimetype='text/html')
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.no_cache = True  # 允许代理存储，但每次需用 ETag 重新验证
+    response.vary.add('Cookie')
+    return response.make_conditional(request)
+
+
+def cached_page(*key):
+    """Return the cached response (or a 304) for an anonymous visitor, or None on a miss"""
+    if not _is_cacheable():
+        return None
+    entry = _page_cache.get((_catalogue_version,) + key)
+    if entry is None:
+        return None
+    return _conditional_response(entry)
+
+
+def cache_page(key, html, competitions, version):
+    """
+    Wrap freshly rendered catalogue HTML in a conditional response and cache it for anonymous
+    visitors. version is catalogue_version() as read before the query, so a page rendered
+    from data that an edit has since replaced is stored under the old, already unused version.
+    """
+    if not _is_cacheable():
+        return html
+    now = datetime.utcnow()
+    body = html.encode('utf-8')
+    entry = (body, hashlib.sha1(body).hexdigest(), _last_modified(competitions, now))
+    ttl = current_app.config['CATALOGUE_CACHE_TTL']
+    until_deadline = _seconds_until_next_deadline(competitions, now)
+    if until_deadline is not None:
+        ttl = min(ttl, until_deadline)
+    if ttl > 0:
+        _page_cache.set((version,) + tuple(key), entry, ttl=ttl)
+    return _conditional_response(entry)
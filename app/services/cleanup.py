@@ -0,0 +1,135 @@
+"""
+Background file deletion queue.
+Paths are recorded in the file_deletion_jobs table inside the same transaction that
+deletes their rows, then removed in batches by a single worker thread (or by
+'flask cleanup-files'), with exponential backoff on failure. A deduplicated object that an
+upload reused after the job was queued is kept, even before the new application commits. After a failed attempt the
+worker arms a timer for the earliest retry. Timers live in the process, so jobs left by a
+restart (or by a process running with FILE_CLEANUP_ASYNC off) wait for the next kick;
+run 'flask cleanup-files' from cron to pick them up.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models.application import Application
+from app.models.file_deletion_job import FileDeletionJob
+from app.services.storage import document_path
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='file-cleanup')
+_retry_lock = threading.Lock()
+_retry_timer = None
+_retry_at = None
+
+
+def enqueue_document_deletions(documents):
+    """Queue removal of (user_id, document_filename, document_sha256) files; commit with the row deletes"""
+    seen = set()
+    for user_id, filename, digest in documents:
+        if not filename:
+            continue
+        path = document_path(user_id, filename, digest)
+        if path not in seen:
+            seen.add(path)
+            db.session.add(FileDeletionJob(path=path, document_sha256=digest))
+    return len(seen)
+
+
+def kick_cleanup_worker():
+    """Process queued deletions in the background (synchronously when FILE_CLEANUP_ASYNC is off)"""
+    app = current_app._get_current_object()
+    if app.config['FILE_CLEANUP_ASYNC']:
+        _executor.submit(_drain_in_context, app)
+    else:
+        drain_deletion_queue()
+
+
+def _drain_in_context(app):
+    with app.app_context():
+        try:
+            drain_deletion_queue()
+            _schedule_retry(app, next_retry_at())
+        except Exception:
+            app.logger.exception('File cleanup worker failed')
+
+
+def _schedule_retry(app, when):
+    # 只保留最早的一个重试定时器；到期后重新提交给后台线程
+    global _retry_timer, _retry_at
+    if when is None:
+        return
+    with _retry_lock:
+        if _retry_timer is not None and _retry_timer.is_alive() and _retry_at <= when:
+            return
+        if _retry_timer is not None:
+            _retry_timer.cancel()
+        delay = max(0.0, (when - datetime.utcnow()).total_seconds())
+        _retry_timer = threading.Timer(delay, _executor.submit, (_drain_in_context, app))
+        _retry_timer.daemon = True
+        _retry_at = when
+        _retry_timer.start()
+
+
+def next_retry_at():
+    """When the earliest failed deletion that still has attempts left is due, or None"""
+    return db.session.query(func.min(FileDeletionJob.next_attempt_at)).filter(
+        FileDeletionJob.attempts > 0,
+        FileDeletionJob.attempts < current_app.config['FILE_CLEANUP_MAX_ATTEMPTS']
+    ).scalar()
+
+
+def _remove_unless_reused(path, since):
+    # 先原子改名再看 mtime：改名前的复用已更新 mtime（放回原处），改名后的复用 utime 失败会重新写入
+    doomed = path + '.deleting'
+    os.rename(path, doomed)
+    if datetime.utcfromtimestamp(os.path.getmtime(doomed)) > since:
+        os.replace(doomed, path)
+        return False
+    try:
+        os.remove(doomed)
+    except OSError:
+        os.replace(doomed, path)  # 放回原处，按退避策略稍后重试
+        raise
+    return True
+
+
+def drain_deletion_queue():
+    """Remove due files batch by batch; returns (removed, failed) counts"""
+    config = current_app.config
+    removed = failed = 0
+    while True:
+        now = datetime.utcnow()
+        jobs = FileDeletionJob.query.filter(
+            FileDeletionJob.next_attempt_at <= now,
+            FileDeletionJob.attempts < config['FILE_CLEANUP_MAX_ATTEMPTS']
+        ).order_by(FileDeletionJob.id).limit(config['FILE_CLEANUP_BATCH_SIZE']).all()
+        if not jobs:
+            break
+        # 去重存储的对象可能已被新的申请重新引用，此时保留文件
+        digests = {job.document_sha256 for job in jobs if job.document_sha256}
+        in_use = set()
+        if digests:
+            in_use = {digest for (digest,) in db.session.query(Application.document_sha256).filter(
+                Application.document_sha256.in_(digests)).distinct()}
+        finished = []
+        for job in jobs:
+            if job.document_sha256 not in in_use:
+                try:
+                    gone = _remove_unless_reused(job.path, job.created_at)
+                except FileNotFoundError:
+                    gone = True
+                except OSError as e:
+                    job.attempts += 1
+                    job.last_error = str(e)
+                    job.next_attempt_at = now + timedelta(seconds=config['FILE_CLEANUP_RETRY_DELAY'] * 2 ** (job.attempts - 1))
+                    failed += 1
+                    continue
+                removed += gone
+            finished.append(job.id)
+        if finished:
+            FileDeletionJob.query.filter(FileDeletionJob.id.in_(finished)).delete(synchronize_session=False)
+        db.session.commit()
+    return removed, failed
@@ -0,0 +1,59 @@
+"""
+On-the-fly gzip for large dynamic responses (JSON, plain text, public catalogue pages).
+Per-user HTML is not compressed: a page that reflects input next to a CSRF token or other
+secret leaks it through the compressed length (BREACH). HTML marked Cache-Control: public
+(the anonymous catalogue pages, identical for every visitor) carries no secret and is still
+compressed.
+Streamed responses, files and anything already encoded are left alone. A strong ETag
+becomes weak, since the compressed bytes are a different representation of the same
+content; If-None-Match still matches it because that comparison is weak.
+"""
+import gzip
+from flask import current_app, request
+from app.services.cache import TTLCache
+
+# 按强 ETag 缓存压缩结果（目录页缓存、API 响应重复时不再重复压缩）
+_compressed_cache = TTLCache(maxsize=128, ttl=300)
+
+
+def _should_compress(response):
+    config = current_app.config
+    return (response.status_code == 200
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and 'Content-Encoding' not in response.headers
+            and response.content_length is not None
+            and response.content_length >= config['COMPRESS_MIN_SIZE']
+            and request.accept_encodings['gzip'])
+
+
+def _compressible_type(response):
+    if response.mimetype in current_app.config['COMPRESS_MIMETYPES']:
+        return True
+    return response.mimetype == 'text/html' and response.cache_control.public
+
+
+def compress_response(response):
+    """after_request hook: gzip the body when the client accepts it and it is worth it"""
+    if not _compressible_type(response):
+        return response
+    response.vary.add('Accept-Encoding')
+    if not _should_compress(response):
+        return response
+    etag, weak = response.get_etag()
+    body = _compressed_cache.get(etag) if etag and not weak else None
+    if body is None:
+        body = gzip.compress(response.get_data(), compresslevel=current_app.config['COMPRESS_LEVEL'])
+        if etag and not weak:
+            _compressed_cache.set(etag, body)
+    response.set_data(body)
+    response.content_encoding = 'gzip'
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Register the response compression hook (COMPRESS_ENABLED)"""
+    if app.config['COMPRESS_ENABLED']:
+        app.after_request(compress_response)
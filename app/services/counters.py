@@ -0,0 +1,110 @@
+"""
+Denormalized per-competition application counters (pending_count / approved_count /
+rejected_count) and the capacity check. Every helper issues set-based UPDATEs inside the
+caller's transaction, so counters commit or roll back together with the application change.
+"""
+from collections import Counter
+from sqlalchemy import func, or_, select, update
+from app import db
+from app.models.competition import Competition
+from app.models.application import Application
+from app.services.catalogue import bump_catalogue_version
+
+COUNTER_COLUMNS = {
+    'pending': 'pending_count',
+    'approved': 'approved_count',
+    'rejected': 'rejected_count',
+}
+# 计数器变化不是赛事编辑：显式保留 updated_at，避免触发 onupdate
+# （updated_at 会出现在 API 与目录页的 Last-Modified 中）
+_KEEP_UPDATED_AT = {'updated_at': Competition.updated_at}
+
+
+def reserve_place(competition_id):
+    """
+    Count one new pending application, but only while the competition has a free place.
+    A single conditional UPDATE, so concurrent applicants cannot overfill it; returns False when full.
+    """
+    result = db.session.execute(
+        update(Competition)
+        .where(Competition.id == competition_id,
+               or_(Competition.capacity.is_(None),
+                   Competition.pending_count + Competition.approved_count < Competition.capacity))
+        .values(pending_count=Competition.pending_count + 1, **_KEEP_UPDATED_AT)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def adjust_counters(deltas):
+    """Apply {(competition_id, status): delta} to the counters; returns the competition ids touched"""
+    per_competition = {}
+    for (competition_id, status), delta in deltas.items():
+        if delta:
+            per_competition.setdefault(competition_id, {})[status] = delta
+    for competition_id, changes in per_competition.items():
+        values = {}
+        for status, delta in changes.items():
+            column = getattr(Competition, COUNTER_COLUMNS[status])
+            values[COUNTER_COLUMNS[status]] = column + delta
+        db.session.execute(update(Competition).where(Competition.id == competition_id)
+                           .values(**values, **_KEEP_UPDATED_AT).execution_options(synchronize_session=False))
+    return set(per_competition)
+
+
+def record_status_changes(changes):
+    """Move counts for [(competition_id, old_status, new_status), ...]; returns the competition ids touched"""
+    deltas = Counter()
+    for competition_id, old_status, new_status in changes:
+        if old_status != new_status:
+            deltas[(competition_id, old_status)] -= 1
+            deltas[(competition_id, new_status)] += 1
+    return adjust_counters(deltas)
+
+
+def record_new_applications(rows):
+    """Count freshly inserted applications given as mappings with competition_id and status"""
+    return adjust_counters(Counter((row['competition_id'], row['status']) for row in rows))
+
+
+def release_applications(*criteria):
+    """Decrement counters for the applications matching criteria; call before deleting them"""
+    rows = db.session.execute(
+        select(Application.competition_id, Application.status, func.count(Application.id))
+        .where(*criteria).group_by(Application.competition_id, Application.status)
+    ).all()
+    return adjust_counters({(competition_id, status): -count for competition_id, status, count in rows})
+
+
+def refresh_catalogue_if_limited(competition_ids):
+    """Catalogue pages only show places left for capacity-limited competitions; bump the cache if one changed"""
+    if competition_ids and db.session.query(Competition.query.filter(
+            Competition.id.in_(competition_ids), Competition.capacity.isnot(None)).exists()).scalar():
+        bump_catalogue_version()
+
+
+def repair_counters():
+    """Recount every competition from the applications table; returns [(competition_id, name, stored, actual)] fixed"""
+    actual = {}
+    for competition_id, status, count in db.session.execute(
+            select(Application.competition_id, Application.status, func.count(Application.id))
+            .group_by(Application.competition_id, Application.status)):
+        if status in COUNTER_COLUMNS:
+            actual.setdefault(competition_id, dict.fromkeys(COUNTER_COLUMNS, 0))[status] = count
+    repaired = []
+    updates = []
+    for competition_id, name, pending, approved, rejected, updated_at in db.session.execute(select(
+            Competition.id, Competition.name, Competition.pending_count, Competition.approved_count,
+            Competition.rejected_count, Competition.updated_at)):
+        stored = {'pending': pending, 'approved': approved, 'rejected': rejected}
+        expected = actual.get(competition_id, dict.fromkeys(COUNTER_COLUMNS, 0))
+        if stored != expected:
+            repaired.append((competition_id, name, stored, expected))
+            updates.append({'id': competition_id, 'updated_at': updated_at,
+                            **{COUNTER_COLUMNS[status]: count for status, count in expected.items()}})
+    if updates:
+        db.session.execute(update(Competition), updates)
+    db.session.commit()
+    if repaired:
+        bump_catalogue_version()
+    return repaired
@@ -0,0 +1,81 @@
+"""
+Identity cache in front of the Flask-Login user loader.
+A lightweight snapshot of each user is kept in a bounded LRU with TTL; the full
+User row is only fetched when a request touches an attribute the snapshot lacks.
+"""
+from sqlalchemy import event
+from app import db
+from app.models.user import User
+from app.services.cache import TTLCache
+
+# 快照只包含模板/权限判断常用的字段
+SNAPSHOT_FIELDS = ('id', 'username', 'email', 'is_admin', 'consent_given', 'created_at')
+
+_identity_cache = TTLCache(maxsize=1024, ttl=300)
+
+
+class CachedUser:
+    """Request-scoped stand-in for current_user, built from a cached snapshot"""
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, snapshot, db_user=None):
+        self.__dict__.update(snapshot)
+        self._db_user = db_user
+
+    @property
+    def db_user(self):
+        """The ORM User row, loaded on first access within this request"""
+        if self._db_user is None:
+            self._db_user = db.session.get(User, self.id)
+        return self._db_user
+
+    def get_id(self):
+        return str(self.id)
+
+    def __getattr__(self, name):
+        # 快照中没有的属性（applications、check_password 等）才回源数据库
+        return getattr(self.db_user, name)
+
+    def __eq__(self, other):
+        return hasattr(other, 'get_id') and self.get_id() == other.get_id()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return f'<CachedUser {self.username} ({self.email})>'
+
+
+def load_identity(user_id):
+    """Return a CachedUser for user_id, hitting the database only on a cache miss"""
+    snapshot = _identity_cache.get(user_id)
+    if snapshot is not None:
+        return CachedUser(snapshot)
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+    snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+    _identity_cache.set(user_id, snapshot)
+    return CachedUser(snapshot, user)
+
+
+def invalidate_identity(user_id):
+    """Forget the cached snapshot for a user (profile/admin flag change, deletion)"""
+    _identity_cache.pop(user_id)
+
+
+def init_identity_cache(app):
+    """Size the cache from USER_CACHE_SIZE / USER_CACHE_TTL"""
+    _identity_cache.maxsize = app.config['USER_CACHE_SIZE']
+    _identity_cache.ttl = app.config['USER_CACHE_TTL']
+    _identity_cache.clear()
+
+
+# ORM 级别的更新/删除自动失效；批量 SQL 删除需显式调用 invalidate_identity
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_on_change(mapper, connection, target):
+    invalidate_identity(target.id)
@@ -0,0 +1,311 @@
+"""
+Bulk import of competitions, users and applications from CSV / JSON Lines files.
+Input is streamed and processed in batches: each batch is validated (with one
+lookup query per reference type), passwords are hashed in parallel, and valid rows
+go in through a single Core INSERT ... executemany, committed per batch.
+"""
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from email_validator import validate_email, EmailNotValidError
+from sqlalchemy import insert, or_
+from app import db
+from app.models.user import User
+from app.models.competition import Competition
+from app.models.application import Application
+from app.services.passwords import get_password_hasher
+from app.services.counters import record_new_applications
+
+IMPORT_KINDS = ('competitions', 'users', 'applications')
+APPLICATION_STATUSES = ('pending', 'approved', 'rejected')
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d')
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on'}
+
+
+class RowError(ValueError):
+    """A single input row failed validation"""
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)  # [(line number, message)]
+
+    def add_error(self, line, message):
+        self.failed += 1
+        self.errors.append((line, message))
+
+
+def read_records(path):
+    """Yield (line number, record) from a .csv, .jsonl/.ndjson or .json (array) file; unparsable lines yield a RowError"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if ext == '.csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        elif ext in ('.jsonl', '.ndjson'):
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_no, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_no, RowError(f'invalid JSON: {e}')
+        elif ext == '.json':
+            # JSON 数组无法流式解析，大文件请使用 JSON Lines
+            for index, record in enumerate(json.load(f), 1):
+                yield index, record
+        else:
+            raise ValueError(f'Unsupported import file type: {ext}')
+
+
+def _parsed_records(batch, result):
+    # 解析失败或不是对象的记录按普通错误行记录，不中断整个导入
+    records = []
+    for line, record in batch:
+        if isinstance(record, RowError):
+            result.add_error(line, str(record))
+        elif not isinstance(record, dict):
+            result.add_error(line, 'record must be an object')
+        else:
+            records.append((line, record))
+    return records
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _text(record, key, required=True, max_length=None):
+    value = record.get(key)
+    value = str(value).strip() if value is not None else ''
+    if required and not value:
+        raise RowError(f'{key} is required')
+    if max_length and len(value) > max_length:
+        raise RowError(f'{key} must not exceed {max_length} characters')
+    return value or None
+
+
+def _datetime(record, key, required=True):
+    value = record.get(key)
+    if value in (None, ''):
+        if required:
+            raise RowError(f'{key} is required')
+        return None
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise RowError(f'{key} is not a valid date/time: {value!r}')
+
+
+def _flag(record, key, default=False, required=False):
+    value = record.get(key)
+    if value in (None, ''):
+        if required:
+            raise RowError(f'{key} is required')
+        return default
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _capacity(record):
+    value = record.get('capacity')
+    if value in (None, ''):
+        return None
+    try:
+        capacity = int(str(value).strip())
+    except ValueError:
+        raise RowError('capacity must be a whole number')
+    if capacity < 1:
+        raise RowError('capacity must be at least 1')
+    return capacity
+
+
+def _validate_competitions(batch, result):
+    now = datetime.utcnow()
+    rows = []
+    for line, record in batch:
+        try:
+            rows.append({
+                'name': _text(record, 'name', max_length=100),
+                'description': _text(record, 'description'),
+                'category': _text(record, 'category', max_length=50),
+                'start_date': _datetime(record, 'start_date'),
+                'application_deadline': _datetime(record, 'application_deadline'),
+                'capacity': _capacity(record),
+                'created_at': now,
+                'updated_at': now,
+            })
+        except RowError as e:
+            result.add_error(line, str(e))
+    return rows
+
+
+def _validate_users(batch, result, seen, hash_passwords):
+    pending = []
+    for line, record in batch:
+        try:
+            username = _text(record, 'username', max_length=20)
+            if len(username) < 2:
+                raise RowError('username must be between 2 and 20 characters')
+            email = _text(record, 'email', max_length=120)
+            try:
+                # 仅校验格式，按原样保存：注册与登录都按输入的原值比较
+                validate_email(email, check_deliverability=False)
+            except EmailNotValidError as e:
+                raise RowError(f'email is invalid: {e}')
+            password = _text(record, 'password', required=False)
+            password_hash = _text(record, 'password_hash', required=False)
+            if not password_hash and (not password or len(password) < 6):
+                raise RowError('password (at least 6 characters) or password_hash is required')
+            if username in seen or email in seen:
+                raise RowError('duplicate username or email within the import file')
+            seen.update((username, email))
+            pending.append((line, {
+                'username': username,
+                'email': email,
+                'password_hash': password_hash,
+                'is_admin': _flag(record, 'is_admin'),
+                # 注册时必须勾选 GDPR 同意，导入不能代为推定
+                'consent_given': _flag(record, 'consent_given', required=True),
+            }, password))
+        except RowError as e:
+            result.add_error(line, str(e))
+
+    # 一次查询检出与数据库中已有用户的冲突
+    if pending:
+        usernames = [row['username'] for _, row, _ in pending]
+        emails = [row['email'] for _, row, _ in pending]
+        taken = set()
+        for username, email in db.session.query(User.username, User.email).filter(
+                or_(User.username.in_(usernames), User.email.in_(emails))):
+            taken.update((username, email))
+        accepted = []
+        for line, row, password in pending:
+            if row['username'] in taken or row['email'] in taken:
+                result.add_error(line, 'username or email is already registered')
+            else:
+                accepted.append((row, password))
+        pending = accepted
+
+    to_hash = [(row, password) for row, password in pending if not row['password_hash']]
+    for (row, _), password_hash in zip(to_hash, hash_passwords([password for _, password in to_hash])):
+        row['password_hash'] = password_hash
+    now = datetime.utcnow()
+    rows = []
+    for row, _ in pending:
+        row['created_at'] = row['updated_at'] = now
+        rows.append(row)
+    return rows
+
+
+def _validate_applications(batch, result, seen):
+    parsed = []
+    for line, record in batch:
+        try:
+            user_ref = _text(record, 'email', required=False) or _text(record, 'username')
+            comp_ref = _text(record, 'competition_id', required=False) or _text(record, 'competition')
+            status = _text(record, 'status', required=False) or 'pending'
+            if status not in APPLICATION_STATUSES:
+                raise RowError(f'status must be one of {", ".join(APPLICATION_STATUSES)}')
+            approved_at = None
+            if status != 'pending':
+                # 与后台审核一致：已审核的申请带审核时间
+                approved_at = _datetime(record, 'approved_at', required=False) or datetime.utcnow()
+            parsed.append((line, user_ref, comp_ref, {
+                'team_name': _text(record, 'team_name', required=False, max_length=100),
+                'notes': _text(record, 'notes', required=False),
+                'status': status,
+                'submission_date': _datetime(record, 'submission_date', required=False) or datetime.utcnow(),
+                'approved_at': approved_at,
+            }))
+        except RowError as e:
+            result.add_error(line, str(e))
+    if not parsed:
+        return []
+
+    # 每批按引用类型各查一次：用户（邮箱/用户名）、赛事（ID/名称）、已存在的申请
+    user_refs = {user_ref for _, user_ref, _, _ in parsed}
+    users = {}
+    for user_id, username, email in db.session.query(User.id, User.username, User.email).filter(
+            or_(User.username.in_(user_refs), User.email.in_(user_refs))):
+        users[username] = users[email] = user_id
+    comp_refs = {comp_ref for _, _, comp_ref, _ in parsed}
+    comp_ids = {int(ref) for ref in comp_refs if ref.isdigit()}
+    competitions = {}
+    for comp_id, name in db.session.query(Competition.id, Competition.name).filter(
+            or_(Competition.id.in_(comp_ids), Competition.name.in_(comp_refs))):
+        competitions[str(comp_id)] = competitions[name] = comp_id
+
+    resolved = []
+    for line, user_ref, comp_ref, row in parsed:
+        if user_ref not in users:
+            result.add_error(line, f'unknown user: {user_ref}')
+        elif comp_ref not in competitions:
+            result.add_error(line, f'unknown competition: {comp_ref}')
+        else:
+            resolved.append((line, dict(row, user_id=users[user_ref], competition_id=competitions[comp_ref])))
+    existing = set()
+    if resolved:
+        existing = set(db.session.query(Application.competition_id, Application.user_id).filter(
+            Application.user_id.in_({row['user_id'] for _, row in resolved}),
+            Application.competition_id.in_({row['competition_id'] for _, row in resolved})))
+    rows = []
+    for line, row in resolved:
+        key = (row['competition_id'], row['user_id'])
+        if key in existing or key in seen:
+            result.add_error(line, 'user has already applied for this competition')
+            continue
+        seen.add(key)
+        rows.append(row)
+    return rows
+
+
+def import_file(kind, path, batch_size=1000, dry_run=False, workers=None):
+    """Import records of the given kind from path; returns an ImportResult"""
+    if kind not in IMPORT_KINDS:
+        raise ValueError(f'Unknown import kind: {kind}')
+    model = {'competitions': Competition, 'users': User, 'applications': Application}[kind]
+    result = ImportResult()
+    seen = set()
+    hasher = get_password_hasher()
+
+    def hash_passwords(passwords):
+        if dry_run:
+            return [None] * len(passwords)  # 仅校验，不插入，无需计算 bcrypt
+        return hasher.hash_many(passwords, workers=workers)
+
+    for batch in _batches(read_records(path), batch_size):
+        batch = _parsed_records(batch, result)
+        if kind == 'competitions':
+            rows = _validate_competitions(batch, result)
+        elif kind == 'users':
+            rows = _validate_users(batch, result, seen, hash_passwords)
+        else:
+            rows = _validate_applications(batch, result, seen)
+        if rows and not dry_run:
+            db.session.execute(insert(model.__table__), rows)
+            if kind == 'applications':
+                # 导入为管理员批量操作，不受名额限制，但计数器与数据在同一事务中更新
+                record_new_applications(rows)
+            db.session.commit()
+        result.imported += len(rows)
+    return result
+
+
+def write_error_report(result, path):
+    """Write the per-row errors of an import as CSV (line, error)"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['line', 'error'])
+        writer.writerows(result.errors)
@@ -0,0 +1,154 @@
+"""
+Per-request SQL and template instrumentation: query count, DB time, render time and the
+slowest statement, recorded through SQLAlchemy cursor events and Flask request hooks.
+Totals feed the Prometheus registry (/admin/metrics); debug responses also carry them as headers.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import before_render_template, current_app, g, request, template_rendered
+from sqlalchemy import event
+from app import db
+from app.services.metrics import registry
+
+# 当前活动的统计收集器（请求级 + assert_max_queries 嵌套使用时同时记录）
+_collectors = ContextVar('query_collectors', default=())
+
+REQUESTS = registry.counter('phg_http_requests_total', 'HTTP requests handled', ('endpoint', 'method', 'status'))
+REQUEST_SECONDS = registry.histogram('phg_http_request_duration_seconds', 'Request handling time', ('endpoint',))
+QUERIES = registry.counter('phg_db_queries_total', 'SQL statements executed while handling requests', ('endpoint',))
+QUERY_SECONDS = registry.counter('phg_db_query_seconds_total', 'Time spent in SQL statements', ('endpoint',))
+RENDER_SECONDS = registry.counter('phg_template_render_seconds_total', 'Time spent rendering templates', ('endpoint',))
+SLOWEST_QUERY = registry.gauge('phg_db_slowest_query_seconds', 'Slowest single SQL statement seen', ('endpoint',))
+QUERIES_PER_REQUEST = registry.histogram('phg_db_queries_per_request', 'SQL statements per request', ('endpoint',),
+                                         buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100))
+
+
+class QueryStats:
+    """Counters for one request (or one assert_max_queries block)"""
+
+    def __init__(self, keep_statements=False):
+        self.count = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+        self.statements = [] if keep_statements else None
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.db_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+        if self.statements is not None:
+            self.statements.append(statement)
+
+
+@contextmanager
+def collect_queries(keep_statements=False):
+    """Record every SQL statement executed in this context into a fresh QueryStats"""
+    stats = QueryStats(keep_statements)
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """Fail with AssertionError when the block issues more than limit SQL statements"""
+    with collect_queries(keep_statements=True) as stats:
+        yield stats
+    if stats.count > limit:
+        listing = '\n'.join(f'  {index}. {statement}' for index, statement in enumerate(stats.statements, 1))
+        raise AssertionError(f'Expected at most {limit} queries, got {stats.count}:\n{listing}')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop('query_started', time.perf_counter())
+    for stats in _collectors.get():
+        stats.record(statement, elapsed)
+
+
+def _before_render(app, template, context, **extra):
+    g.setdefault('render_started', []).append(time.perf_counter())
+
+
+def _after_render(app, template, context, **extra):
+    started = g.get('render_started')
+    if started:
+        elapsed = time.perf_counter() - started.pop()
+        stats = g.get('request_stats')
+        # 嵌套渲染（模板内再渲染）只计算最外层
+        if stats is not None and not started:
+            stats.render_time += elapsed
+
+
+def _detach(stats):
+    _collectors.set(tuple(active for active in _collectors.get() if active is not stats))
+
+
+def _debug_headers_enabled():
+    enabled = current_app.config['METRICS_DEBUG_HEADERS']
+    return current_app.debug if enabled is None else enabled
+
+
+def _start_request():
+    g.request_started = time.perf_counter()
+    g.request_stats = QueryStats()
+    _collectors.set(_collectors.get() + (g.request_stats,))
+
+
+def _finish_request(response):
+    stats = g.pop('request_stats', None)
+    if stats is None:
+        return response
+    _detach(stats)
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.endpoint or 'unmatched'
+    REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+    QUERIES.inc(stats.count, endpoint=endpoint)
+    QUERIES_PER_REQUEST.observe(stats.count, endpoint=endpoint)
+    QUERY_SECONDS.inc(stats.db_time, endpoint=endpoint)
+    RENDER_SECONDS.inc(stats.render_time, endpoint=endpoint)
+    SLOWEST_QUERY.track_max(stats.slowest_time, endpoint=endpoint)
+
+    if _debug_headers_enabled():
+        response.headers['X-Query-Count'] = str(stats.count)
+        response.headers['X-DB-Time-Ms'] = f'{stats.db_time * 1000:.2f}'
+        response.headers['X-Render-Time-Ms'] = f'{stats.render_time * 1000:.2f}'
+        response.headers['X-Request-Time-Ms'] = f'{elapsed * 1000:.2f}'
+        if stats.slowest_statement:
+            response.headers['X-Slowest-Query-Ms'] = f'{stats.slowest_time * 1000:.2f}'
+            response.headers['X-Slowest-Query'] = ' '.join(stats.slowest_statement.split())[:200]
+    return response
+
+
+def _abandon_request(exc=None):
+    # after_request 未执行（未处理的异常）时也要移除收集器
+    stats = g.pop('request_stats', None)
+    if stats is not None:
+        _detach(stats)
+
+
+def init_instrumentation(app):
+    """Attach SQL cursor events to the app's engine and register the request hooks"""
+    if not app.config['METRICS_ENABLED']:
+        return
+    with app.app_context():
+        engine = db.engine  # 仅创建 Engine 对象，不会建立连接
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_abandon_request)
@@ -0,0 +1,51 @@
+import base64
+import binascii
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(timestamp, row_id):
+    """Encode a (datetime, id) keyset position as an opaque URL-safe token"""
+    raw = f'{timestamp.isoformat()}|{row_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a token produced by encode_cursor; returns None if it is malformed"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        timestamp, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, binascii.Error, UnicodeError):
+        return None
+
+
+def get_page_size(args, default, maximum):
+    """Read the per_page query argument, clamped to [1, maximum]"""
+    per_page = args.get('per_page', default, type=int)
+    return max(1, min(per_page, maximum))
+
+
+def keyset_page(query, sort_column, id_column, cursor, per_page, descending=False):
+    """
+    Fetch one page of query ordered by (sort_column, id_column), starting after the decoded
+    cursor. Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        value, last_id = cursor
+        if descending:
+            query = query.filter(or_(sort_column < value, and_(sort_column == value, id_column < last_id)))
+        else:
+            query = query.filter(or_(sort_column > value, and_(sort_column == value, id_column > last_id)))
+    order = (sort_column.desc(), id_column.desc()) if descending else (sort_column, id_column)
+    # 多取一行用于判断是否存在下一页
+    rows = query.order_by(*order).limit(per_page + 1).all()
+    page = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = page[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return page, next_cursor
@@ -0,0 +1,130 @@
+"""
+Password hashing service (bcrypt) with a configurable work factor.
+The 'inline' backend hashes in the calling thread; the 'process' backend runs
+bcrypt in a per-process pool of worker processes, with a semaphore bounding how
+many hashes may be queued at once. Hashes are compatible with Flask-Bcrypt.
+"""
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import bcrypt as _bcrypt
+from flask import current_app
+
+PASSWORD_HASH_BACKENDS = ('inline', 'process')
+
+
+def _hashpw(password, rounds, prefix):
+    return _bcrypt.hashpw(password, _bcrypt.gensalt(rounds=rounds, prefix=prefix)).decode('utf-8')
+
+
+def _checkpw(password, password_hash):
+    return hmac.compare_digest(_bcrypt.hashpw(password, password_hash), password_hash)
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords with a fixed cost, inline or in a process pool"""
+
+    def __init__(self, rounds=12, prefix='2b', handle_long_passwords=False, backend='inline',
+                 workers=None, max_pending=None):
+        if backend not in PASSWORD_HASH_BACKENDS:
+            raise ValueError(f'Unknown password hash backend: {backend}')
+        self.rounds = rounds
+        self.prefix = prefix.encode('ascii')
+        self.handle_long_passwords = handle_long_passwords
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(max_pending or self.workers * 4)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            rounds=config['BCRYPT_LOG_ROUNDS'],
+            prefix=config.get('BCRYPT_HASH_PREFIX', '2b'),
+            handle_long_passwords=config.get('BCRYPT_HANDLE_LONG_PASSWORDS', False),
+            backend=config['PASSWORD_HASH_BACKEND'],
+            workers=config['PASSWORD_HASH_WORKERS'],
+            max_pending=config['PASSWORD_HASH_MAX_PENDING'],
+        )
+
+    def _encode(self, password):
+        if not password:
+            raise ValueError('Password must be non-empty.')
+        password = password.encode('utf-8') if isinstance(password, str) else password
+        if self.handle_long_passwords:
+            password = hashlib.sha256(password).hexdigest().encode('ascii')
+        return password
+
+    def _get_pool(self):
+        # 延迟创建，并在 fork 后（如 gunicorn worker）重新创建
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        if self.backend == 'inline':
+            return fn(*args)
+        with self._slots:
+            return self._get_pool().submit(fn, *args).result()
+
+    def hash(self, password):
+        """Return a bcrypt hash string for password at the configured cost"""
+        return self._run(_hashpw, self._encode(password), self.rounds, self.prefix)
+
+    def verify(self, password_hash, password):
+        """Constant-time check of password against password_hash; False for malformed hashes"""
+        try:
+            return self._run(_checkpw, self._encode(password), password_hash.encode('utf-8'))
+        except ValueError:
+            return False
+
+    def needs_rehash(self, password_hash):
+        """True when password_hash was made with a different cost or prefix than configured"""
+        try:
+            _, prefix, rounds, _ = password_hash.split('$', 3)
+            return prefix.encode('ascii') != self.prefix or int(rounds) != self.rounds
+        except ValueError:
+            return True
+
+    def hash_many(self, passwords, workers=None):
+        """Hash a list of passwords in parallel, preserving order"""
+        encoded = [self._encode(password) for password in passwords]
+        args = ([self.rounds] * len(encoded), [self.prefix] * len(encoded))
+        if self.backend == 'process':
+            return list(self._get_pool().map(_hashpw, encoded, *args, chunksize=8))
+        # bcrypt 计算时释放 GIL，批量场景下线程池即可利用多核
+        with ThreadPoolExecutor(max_workers=workers or self.workers) as pool:
+            return list(pool.map(_hashpw, encoded, *args))
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown()
+            self._pool = None
+
+
+def init_password_hasher(app):
+    """Create the app's PasswordHasher from BCRYPT_LOG_ROUNDS / PASSWORD_HASH_* settings"""
+    app.extensions['password_hasher'] = PasswordHasher.from_config(app.config)
+
+
+def get_password_hasher():
+    return current_app.extensions['password_hasher']
+
+
+def hash_password(password):
+    return get_password_hasher().hash(password)
+
+
+def verify_password(password_hash, password):
+    return get_password_hasher().verify(password_hash, password)
+
+
+def password_needs_rehash(password_hash):
+    return get_password_hasher().needs_rehash(password_hash)
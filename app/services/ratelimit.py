@@ -0,0 +1,106 @@
+"""
+Token-bucket rate limiting for the endpoints that spend bcrypt CPU (login, registration)
+and for the registration availability check.
+Buckets live in a bounded in-process LRU by default; set RATELIMIT_STORAGE_URL to a
+redis:// URL (pip install redis) to share them between processes and hosts. Limits are
+(capacity, period in seconds) pairs in RATELIMITS: a full bucket allows a burst of
+`capacity` attempts and refills at capacity / period tokens per second.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from app.services.metrics import registry
+
+ATTEMPTS = registry.counter('phg_ratelimit_attempts_total', 'Attempts checked by the rate limiter', ('limit', 'outcome'))
+TRACKED_KEYS = registry.gauge('phg_ratelimit_tracked_keys', 'Token buckets held in process memory')
+
+# KEYS[1] = bucket; ARGV = capacity, refill rate (tokens/s), now (s)。返回 {是否放行, 剩余令牌}
+_REDIS_TAKE = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class MemoryBucketStore:
+    """Token buckets in an LRU-bounded dict; the least recently used bucket is evicted (i.e. reset to full)"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        """Take one token; returns 0 when allowed, else the seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            TRACKED_KEYS.set(len(self._buckets))
+        return wait
+
+
+class RedisBucketStore:
+    """Token buckets shared through Redis (one atomic Lua script per attempt); fails open if Redis is down"""
+
+    def __init__(self, url):
+        import redis  # 可选依赖，仅在配置了 RATELIMIT_STORAGE_URL 时需要
+        self._client = redis.Redis.from_url(url)  # 首次使用时才建立连接
+        self._take = self._client.register_script(_REDIS_TAKE)
+
+    def take(self, key, capacity, rate):
+        try:
+            allowed, tokens = self._take(keys=[f'phg:ratelimit:{key}'], args=[capacity, rate, time.time()])
+        except Exception:
+            current_app.logger.warning('Rate limiter storage unavailable; allowing the attempt', exc_info=True)
+            return 0
+        return 0 if int(allowed) else (1 - float(tokens)) / rate
+
+
+def init_rate_limiter(app):
+    """Create the bucket store from RATELIMIT_STORAGE_URL / RATELIMIT_MAX_KEYS"""
+    url = app.config['RATELIMIT_STORAGE_URL']
+    app.extensions['rate_limiter'] = RedisBucketStore(url) if url else MemoryBucketStore(app.config['RATELIMIT_MAX_KEYS'])
+
+
+def check_rate_limits(*checks):
+    """
+    Take a token from each (limit name, key) bucket in order, stopping at the first empty one.
+    Returns 0 when the attempt may proceed, else the whole seconds to wait (for Retry-After).
+    """
+    config = current_app.config
+    if not config['RATELIMIT_ENABLED']:
+        return 0
+    store = current_app.extensions['rate_limiter']
+    for name, key in checks:
+        if not key:
+            continue
+        capacity, period = config['RATELIMITS'][name]
+        wait = store.take(f'{name}:{key}', capacity, capacity / period)
+        if wait:
+            ATTEMPTS.inc(limit=name, outcome='rejected')
+            return max(1, math.ceil(wait))
+        ATTEMPTS.inc(limit=name, outcome='served')
+    return 0
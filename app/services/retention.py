@@ -0,0 +1,137 @@
+"""
+GDPR retention purge driven by DATA_RETENTION_PERIOD.
+Applications expire once their competition took place more than a retention period ago;
+accounts expire when they have not logged in (or, never having logged in, registered) within
+the period, are not admins and have no applications left. Accounts that predate login
+tracking were stamped by the upgrade that added users.last_login_at, so their period starts
+there. Rows are removed in bounded batches, each in its own short transaction with a pause
+in between, so the SQLite write lock is never held for long. Every batch deletes exactly
+what it selected, so an interrupted run resumes where it stopped when started again.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, delete, exists, func, or_, select
+from app import db
+from app.models.user import User
+from app.models.competition import Competition
+from app.models.application import Application
+from app.services.cleanup import enqueue_document_deletions
+from app.services.counters import release_applications, refresh_catalogue_if_limited
+from app.services.identity import invalidate_identity
+from app.services.stats import invalidate_dashboard_stats
+
+
+@dataclass
+class PurgeResult:
+    applications: int = 0
+    users: int = 0
+    files: int = 0  # documents queued for deletion
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows(self):
+        return self.applications + self.users
+
+    @property
+    def rate(self):
+        """Rows deleted per second"""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def retention_cutoff(now=None):
+    """Anything older than this instant is past the retention period"""
+    return (now or datetime.utcnow()) - current_app.config['DATA_RETENTION_PERIOD']
+
+
+def _expired_competition_ids(cutoff):
+    # start_date 索引上的范围扫描；已清空的旧赛事由 EXISTS 快速排除
+    return db.session.scalars(select(Competition.id).where(
+        Competition.start_date < cutoff,
+        exists().where(Application.competition_id == Competition.id)
+    ).order_by(Competition.id)).all()
+
+
+def _inactive_users(cutoff, projected=False):
+    # projected=True：假设过期申请已被清除（用于 dry run 统计）
+    remaining = exists().where(Application.user_id == User.id)
+    if projected:
+        remaining = remaining.where(Application.competition_id.in_(
+            select(Competition.id).where(Competition.start_date >= cutoff)))
+    return and_(
+        or_(User.last_login_at < cutoff, and_(User.last_login_at.is_(None), User.created_at < cutoff)),
+        or_(User.is_admin.is_(False), User.is_admin.is_(None)),
+        ~remaining,
+    )
+
+
+def count_expired(cutoff):
+    """(applications, users) that purge_expired would delete for this cutoff"""
+    applications = db.session.scalar(select(func.count(Application.id)).where(
+        Application.competition_id.in_(select(Competition.id).where(Competition.start_date < cutoff))))
+    users = db.session.scalar(select(func.count(User.id)).where(_inactive_users(cutoff, projected=True)))
+    return applications, users
+
+
+def purge_expired(cutoff=None, batch_size=None, pause=None, progress=None):
+    """
+    Delete expired applications, then inactive accounts, batch_size rows per transaction.
+    progress(result) is called after every committed batch. Document files are queued on the
+    cleanup queue in the same transaction as their rows; run kick_cleanup_worker() or
+    drain_deletion_queue() afterwards to remove them. Returns a PurgeResult.
+    """
+    config = current_app.config
+    cutoff = cutoff or retention_cutoff()
+    batch_size = batch_size or config['RETENTION_BATCH_SIZE']
+    pause = config['RETENTION_BATCH_PAUSE_MS'] / 1000 if pause is None else pause
+    result = PurgeResult()
+    started = time.perf_counter()
+
+    def commit_batch():
+        db.session.commit()
+        result.batches += 1
+        result.elapsed = time.perf_counter() - started
+        if progress:
+            progress(result)
+        if pause:
+            time.sleep(pause)  # 让出写锁给 Web 请求
+
+    touched = set()
+    for competition_id in _expired_competition_ids(cutoff):
+        while True:
+            rows = db.session.execute(select(
+                Application.id, Application.user_id, Application.document_filename, Application.document_sha256
+            ).where(Application.competition_id == competition_id).limit(batch_size)).all()
+            if not rows:
+                break
+            ids = [row.id for row in rows]
+            touched |= release_applications(Application.id.in_(ids))
+            result.files += enqueue_document_deletions(
+                (row.user_id, row.document_filename, row.document_sha256) for row in rows)
+            db.session.execute(delete(Application).where(Application.id.in_(ids))
+                               .execution_options(synchronize_session=False))
+            result.applications += len(ids)
+            commit_batch()
+            if len(rows) < batch_size:
+                break
+
+    while True:
+        user_ids = db.session.scalars(select(User.id).where(_inactive_users(cutoff))
+                                      .order_by(User.id).limit(batch_size)).all()
+        if not user_ids:
+            break
+        db.session.execute(delete(User).where(User.id.in_(user_ids)).execution_options(synchronize_session=False))
+        result.users += len(user_ids)
+        commit_batch()
+        for user_id in user_ids:
+            invalidate_identity(user_id)
+        if len(user_ids) < batch_size:
+            break
+
+    if result.rows:
+        invalidate_dashboard_stats()
+        refresh_catalogue_if_limited(touched)
+    result.elapsed = time.perf_counter() - started
+    return result
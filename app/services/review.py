@@ -0,0 +1,51 @@
+from datetime import datetime
+from app import db
+from app.models.application import Application
+from app.services.counters import record_status_changes, refresh_catalogue_if_limited
+
+# SQLite 单条语句的绑定参数上限较低，IN 列表按块拆分（仍在同一事务中）
+_IN_CHUNK = 500
+
+
+def bulk_review(new_status, notes=None, application_ids=None, filter_status=None):
+    """
+    Set new_status on the given IDs, or on every application matching filter_status
+    ('all' or None matches everything). Runs in one transaction and stamps a single
+    approved_at. Returns (outcomes, reviewed_at) where outcomes maps id -> 'updated' |
+    'unchanged' | 'not_found'.
+    """
+    query = db.session.query(Application.id, Application.status, Application.competition_id)
+    if application_ids is not None:
+        requested = set(application_ids)
+        rows = []
+        ids = sorted(requested)
+        for start in range(0, len(ids), _IN_CHUNK):
+            rows += query.filter(Application.id.in_(ids[start:start + _IN_CHUNK])).all()
+    else:
+        if filter_status and filter_status != 'all':
+            query = query.filter(Application.status == filter_status)
+        rows = query.all()
+        requested = {row_id for row_id, _, _ in rows}
+
+    outcomes = dict.fromkeys(requested, 'not_found')
+    to_update = []
+    changes = []
+    for row_id, status, competition_id in rows:
+        if status == new_status:
+            outcomes[row_id] = 'unchanged'
+        else:
+            outcomes[row_id] = 'updated'
+            to_update.append(row_id)
+            changes.append((competition_id, status, new_status))
+
+    reviewed_at = datetime.utcnow()
+    values = {'status': new_status, 'approved_at': reviewed_at}
+    if notes:
+        values['notes'] = notes
+    for start in range(0, len(to_update), _IN_CHUNK):
+        Application.query.filter(Application.id.in_(to_update[start:start + _IN_CHUNK])).update(
+            values, synchronize_session=False)
+    touched = record_status_changes(changes)
+    db.session.commit()
+    refresh_catalogue_if_limited(touched)
+    return outcomes, reviewed_at
@@ -0,0 +1,196 @@
+"""
+Indexed search over competitions and applications.
+On SQLite the text query is matched against FTS5 tables (competitions_fts, applications_fts)
+that triggers keep in sync with the base tables; they are created by flask upgrade-db /
+flask bootstrap. Other backends, or SQLite builds without FTS5, fall back to LIKE matching.
+"""
+import re
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, or_, select, text, literal_column
+from app import db
+from app.models.user import User
+from app.models.competition import Competition
+from app.models.application import Application
+from app.services.export import parse_date
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+_MAX_TERMS = 8
+_TOKENIZER = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+# 表名 -> (建表语句, {触发器名: 触发器语句}, 回填语句)
+FTS_SCHEMA = {
+    'competitions_fts': (
+        "CREATE VIRTUAL TABLE competitions_fts USING fts5("
+        f"name, description, category, content='competitions', content_rowid='id', {_TOKENIZER})",
+        {
+            'competitions_fts_ai': (
+                "CREATE TRIGGER competitions_fts_ai AFTER INSERT ON competitions BEGIN "
+                "INSERT INTO competitions_fts(rowid, name, description, category) "
+                "VALUES (new.id, new.name, new.description, new.category); END"),
+            'competitions_fts_ad': (
+                "CREATE TRIGGER competitions_fts_ad AFTER DELETE ON competitions BEGIN "
+                "INSERT INTO competitions_fts(competitions_fts, rowid, name, description, category) "
+                "VALUES ('delete', old.id, old.name, old.description, old.category); END"),
+            'competitions_fts_au': (
+                "CREATE TRIGGER competitions_fts_au AFTER UPDATE OF name, description, category ON competitions BEGIN "
+                "INSERT INTO competitions_fts(competitions_fts, rowid, name, description, category) "
+                "VALUES ('delete', old.id, old.name, old.description, old.category); "
+                "INSERT INTO competitions_fts(rowid, name, description, category) "
+                "VALUES (new.id, new.name, new.description, new.category); END"),
+        },
+        "INSERT INTO competitions_fts(competitions_fts) VALUES ('rebuild')",
+    ),
+    # 申请人用户名/邮箱来自 users 表，因此使用独立存储的 FTS 表（rowid = applications.id）
+    'applications_fts': (
+        f"CREATE VIRTUAL TABLE applications_fts USING fts5(username, email, team_name, {_TOKENIZER})",
+        {
+            'applications_fts_ai': (
+                "CREATE TRIGGER applications_fts_ai AFTER INSERT ON applications BEGIN "
+                "INSERT INTO applications_fts(rowid, username, email, team_name) "
+                "SELECT new.id, users.username, users.email, coalesce(new.team_name, '') "
+                "FROM users WHERE users.id = new.user_id; END"),
+            'applications_fts_ad': (
+                "CREATE TRIGGER applications_fts_ad AFTER DELETE ON applications BEGIN "
+                "DELETE FROM applications_fts WHERE rowid = old.id; END"),
+            'applications_fts_au': (
+                "CREATE TRIGGER applications_fts_au AFTER UPDATE OF team_name, user_id ON applications BEGIN "
+                "DELETE FROM applications_fts WHERE rowid = old.id; "
+                "INSERT INTO applications_fts(rowid, username, email, team_name) "
+                "SELECT new.id, users.username, users.email, coalesce(new.team_name, '') "
+                "FROM users WHERE users.id = new.user_id; END"),
+            'users_fts_au': (
+                "CREATE TRIGGER users_fts_au AFTER UPDATE OF username, email ON users BEGIN "
+                "UPDATE applications_fts SET username = new.username, email = new.email "
+                "WHERE rowid IN (SELECT id FROM applications WHERE user_id = new.id); END"),
+        },
+        "INSERT INTO applications_fts(rowid, username, email, team_name) "
+        "SELECT applications.id, users.username, users.email, coalesce(applications.team_name, '') "
+        "FROM applications JOIN users ON users.id = applications.user_id",
+    ),
+}
+
+
+def ensure_search_index():
+    """Create missing FTS5 tables/triggers and backfill new tables (SQLite with FTS5 only); returns created names"""
+    if db.engine.dialect.name != 'sqlite':
+        return []
+    created = []
+    with db.engine.begin() as conn:
+        if not conn.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar():
+            return []
+        existing = {name for name, in conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+        for table, (create_table, triggers, backfill) in FTS_SCHEMA.items():
+            new_table = table not in existing
+            if new_table:
+                conn.exec_driver_sql(create_table)
+                created.append(table)
+            for trigger, ddl in triggers.items():
+                if trigger not in existing:
+                    conn.exec_driver_sql(ddl)
+                    created.append(trigger)
+            if new_table:
+                conn.exec_driver_sql(backfill)
+    current_app.extensions.pop('search_fts_tables', None)
+    return created
+
+
+def _fts_tables():
+    # 每个进程只查询一次 sqlite_master；ensure_search_index 会清除该缓存
+    tables = current_app.extensions.get('search_fts_tables')
+    if tables is None:
+        tables = set()
+        if db.engine.dialect.name == 'sqlite':
+            tables = set(db.session.scalars(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('competitions_fts', 'applications_fts')")))
+        current_app.extensions['search_fts_tables'] = tables
+    return tables
+
+
+def search_terms(query):
+    """Word tokens of a free-text query (at most _MAX_TERMS)"""
+    return _TERM.findall(query or '')[:_MAX_TERMS]
+
+
+def _match_ids(table, terms):
+    # 每个词做前缀匹配，多个词之间为 AND
+    match = ' '.join(f'"{term}"*' for term in terms)
+    return select(literal_column('rowid')).select_from(text(table)).where(
+        text(f'{table} MATCH :match').bindparams(match=match))
+
+
+def _like_any(columns, terms):
+    return and_(*(or_(*(column.ilike(f'%{term}%') for column in columns)) for term in terms))
+
+
+def competition_filters(args):
+    """Raw competition filters from request args (empty values dropped); usable directly in url_for"""
+    filters = {
+        'q': (args.get('q') or '').strip(),
+        'category': args.get('category') or '',
+        'state': args.get('state') if args.get('state') in ('open', 'closed') else '',
+        'from': args.get('from') or '',
+        'to': args.get('to') or '',
+    }
+    return {key: value for key, value in filters.items() if value}
+
+
+def search_competitions(filters):
+    """Competition query for the filters; raises ValueError on a malformed date. Dates bound start_date to [from, to)"""
+    query = Competition.query
+    terms = search_terms(filters.get('q'))
+    if terms:
+        if 'competitions_fts' in _fts_tables():
+            query = query.filter(Competition.id.in_(_match_ids('competitions_fts', terms)))
+        else:
+            query = query.filter(_like_any((Competition.name, Competition.description, Competition.category), terms))
+    if filters.get('category'):
+        query = query.filter(Competition.category == filters['category'])
+    now = datetime.utcnow()
+    if filters.get('state') == 'open':
+        query = query.filter(Competition.application_deadline > now)
+    elif filters.get('state') == 'closed':
+        query = query.filter(Competition.application_deadline <= now)
+    date_from, date_to = parse_date(filters.get('from')), parse_date(filters.get('to'))
+    if date_from is not None:
+        query = query.filter(Competition.start_date >= date_from)
+    if date_to is not None:
+        query = query.filter(Competition.start_date < date_to)
+    return query
+
+
+def application_filters(args):
+    """Raw application search filters (besides status) from request args"""
+    filters = {
+        'q': (args.get('q') or '').strip(),
+        'competition_id': args.get('competition_id', type=int),
+        'from': args.get('from') or '',
+        'to': args.get('to') or '',
+    }
+    return {key: value for key, value in filters.items() if value}
+
+
+def search_applications(query, filters, status=None):
+    """Narrow an Application query (already joined to users/competitions) by the filters and status"""
+    terms = search_terms(filters.get('q'))
+    if terms:
+        if 'applications_fts' in _fts_tables():
+            query = query.filter(Application.id.in_(_match_ids('applications_fts', terms)))
+        else:
+            query = query.filter(_like_any((User.username, User.email, Application.team_name), terms))
+    if status:
+        query = query.filter(Application.status == status)
+    if filters.get('competition_id'):
+        query = query.filter(Application.competition_id == filters['competition_id'])
+    date_from, date_to = parse_date(filters.get('from')), parse_date(filters.get('to'))
+    if date_from is not None:
+        query = query.filter(Application.submission_date >= date_from)
+    if date_to is not None:
+        query = query.filter(Application.submission_date < date_to)
+    return query
+
+
+def competition_categories():
+    """Distinct competition categories for the filter drop-down"""
+    return db.session.scalars(select(Competition.category).distinct().order_by(Competition.category)).all()
@@ -0,0 +1,42 @@
+from flask import current_app
+from sqlalchemy import case, func, select
+from app import db
+from app.models.user import User
+from app.models.competition import Competition
+from app.models.application import Application
+from app.services.cache import TTLCache
+
+# 仪表盘统计缓存（进程内，短 TTL；写操作提交后主动失效）
+_stats_cache = TTLCache(maxsize=1)
+_STATS_KEY = 'dashboard'
+
+
+def _status_count(status):
+    return func.coalesce(func.sum(case((Application.status == status, 1), else_=0)), 0)
+
+
+def _query_dashboard_stats():
+    """One round trip: per-status aggregates over applications plus scalar subqueries for users/competitions"""
+    stmt = select(
+        select(func.count(User.id)).scalar_subquery().label('total_users'),
+        select(func.count(Competition.id)).scalar_subquery().label('total_competitions'),
+        func.count(Application.id).label('total_applications'),
+        _status_count('pending').label('pending_applications'),
+        _status_count('approved').label('approved_applications'),
+        _status_count('rejected').label('rejected_applications'),
+    ).select_from(Application.__table__)
+    return dict(db.session.execute(stmt).mappings().one())
+
+
+def get_dashboard_stats():
+    """Return cached dashboard counters, recomputing them when the TTL has elapsed"""
+    stats = _stats_cache.get(_STATS_KEY)
+    if stats is None:
+        stats = _query_dashboard_stats()
+        _stats_cache.set(_STATS_KEY, stats, ttl=current_app.config['DASHBOARD_STATS_TTL'])
+    return stats
+
+
+def invalidate_dashboard_stats():
+    """Drop cached counters; call after committing any change to users, competitions or applications"""
+    _stats_cache.pop(_STATS_KEY)
@@ -0,0 +1,133 @@
+"""
+Content-addressed document storage.
+Uploads are hashed (SHA-256) while Werkzeug streams them to disk, then renamed into
+UPLOAD_FOLDER/objects/<aa>/<digest>; identical documents are stored only once.
+Downloads go through send_document, which can hand the transfer to the front web server.
+"""
+import hashlib
+import os
+import tempfile
+from flask import abort, current_app, request, Request
+from werkzeug.utils import send_file
+
+OBJECTS_DIR = 'objects'
+TMP_DIR = 'tmp'
+
+
+class HashingSpoolFile:
+    """Upload container that hashes bytes as they are written to a temp file inside UPLOAD_FOLDER"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix='upload-', dir=directory)
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self._committed = False
+        self.size = 0
+
+    def write(self, data):
+        self._hash.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def commit_to(self, target):
+        """Move the spooled bytes to their final location (a rename, not a second copy)"""
+        self._file.close()
+        os.replace(self.path, target)
+        self._committed = True
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self._committed:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """Request class that streams file parts straight into a HashingSpoolFile"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if filename is None:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return HashingSpoolFile(os.path.join(current_app.config['UPLOAD_FOLDER'], TMP_DIR))
+
+
+def object_path(digest):
+    """Filesystem path of a stored document by its SHA-256 digest"""
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], OBJECTS_DIR, digest[:2], digest)
+
+
+def document_path(user_id, document_filename, document_sha256):
+    """Path of an application's document: content-addressed, or the legacy per-user location"""
+    if document_sha256:
+        return object_path(document_sha256)
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], str(user_id), document_filename)
+
+
+def store_upload(file_storage):
+    """Persist an uploaded FileStorage; returns (sha256 hex digest, size in bytes)"""
+    spool = file_storage.stream
+    if not isinstance(spool, HashingSpoolFile):
+        # 非流式解析得到的文件（例如内存中的小文件）：按固定块大小边复制边计算哈希
+        spool = HashingSpoolFile(os.path.join(current_app.config['UPLOAD_FOLDER'], TMP_DIR))
+        chunk_size = current_app.config['UPLOAD_CHUNK_SIZE']
+        file_storage.stream.seek(0)
+        for chunk in iter(lambda: file_storage.stream.read(chunk_size), b''):
+            spool.write(chunk)
+    digest, size = spool.hexdigest(), spool.size
+    target = object_path(digest)
+    if os.path.exists(target):
+        try:
+            # 相同内容已存储，直接复用；更新 mtime，清理线程据此保留尚未提交引用的对象
+            os.utime(target)
+            spool.close()
+            return digest, size
+        except FileNotFoundError:
+            pass  # 刚被清理线程删除，重新写入
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    spool.commit_to(target)
+    return digest, size
+
+
+def send_document(application):
+    """
+    Response serving an application's document (Range and conditional requests supported).
+    With DOCUMENT_SENDFILE set, only headers are produced and the web server streams the file;
+    otherwise the file is passed to the WSGI server's file wrapper (sendfile where available).
+    """
+    config = current_app.config
+    path = document_path(application.user_id, application.document_filename, application.document_sha256)
+    if not application.document_filename or not os.path.isfile(path):
+        abort(404, description='This document does not exist')
+    mode = config['DOCUMENT_SENDFILE']
+    if mode == 'x-accel-redirect':
+        # nginx 处理 Range / If-None-Match；Python 只返回内部跳转地址
+        relative = os.path.relpath(path, config['UPLOAD_FOLDER']).replace(os.sep, '/')
+        response = send_file(path, request.environ, download_name=application.document_filename,
+                             conditional=False, etag=False, use_x_sendfile=True,
+                             response_class=current_app.response_class)
+        del response.headers['X-Sendfile']
+        response.content_length = 0
+        response.headers['X-Accel-Redirect'] = config['DOCUMENT_ACCEL_PREFIX'].rstrip('/') + '/' + relative
+    else:
+        # 内容寻址存储：SHA-256 即强 ETag；X-Sendfile 模式下 Range 由前端服务器处理，这里不生成 206
+        sendfile = mode == 'x-sendfile'
+        response = send_file(path, request.environ, download_name=application.document_filename,
+                             conditional=not sendfile, etag=application.document_sha256 or True,
+                             use_x_sendfile=sendfile, response_class=current_app.response_class)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.headers['X-Content-Type-Options'] = 'nosniff'  # 上传内容不可被浏览器当作 HTML 解析
+    return response
@@ -50,4 +50,70 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         }
     }
-});
\ No newline at end of file
+});
+
+// 页面加载动画
+document.addEventListener('DOMContentLoaded', function() {
+    // 平滑滚动
+    document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+        anchor.addEventListener('click', function (e) {
+            e.preventDefault();
+            document.querySelector(this.getAttribute('href')).scrollIntoView({
+                behavior: 'smooth'
+            });
+        });
+    });
+
+    // 导航栏滚动效果
+    window.addEventListener('scroll', function() {
+        const navbar = document.querySelector('.navbar');
+        if (window.scrollY > 10) {
+            navbar.classList.add('py-0.5');
+            navbar.classList.remove('py-0.8');
+        } else {
+            navbar.classList.add('py-0.8');
+            navbar.classList.remove('py-0.5');
+        }
+    });
+});
+
+// 注册页：用户名/邮箱可用性即时检查（输入停止 400ms 后请求，旧请求会被取消）
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('input[data-availability-url]').forEach(input => {
+        let timer = null;
+        let controller = null;
+        let feedback = input.parentElement.querySelector('.invalid-feedback');
+        if (!feedback) {
+            feedback = document.createElement('div');
+            feedback.className = 'invalid-feedback';
+            input.insertAdjacentElement('afterend', feedback);
+        }
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            if (controller) {
+                controller.abort();
+            }
+            const value = input.value.trim();
+            if (!value) {
+                input.classList.remove('is-valid', 'is-invalid');
+                return;
+            }
+            timer = setTimeout(() => {
+                controller = new AbortController();
+                const url = input.dataset.availabilityUrl + '?' + new URLSearchParams({[input.name]: value});
+                fetch(url, {signal: controller.signal, headers: {'Accept': 'application/json'}})
+                    .then(response => response.ok ? response.json() : null)
+                    .then(result => {
+                        if (!result) {
+                            return;
+                        }
+                        input.classList.toggle('is-valid', result.available);
+                        input.classList.toggle('is-invalid', !result.available);
+                        feedback.textContent = result.message || '';
+                    })
+                    .catch(() => {});  // 网络错误或已取消：提交时服务器仍会校验
+            }, 400);
+        });
+    });
+});
@@ -0,0 +1,385 @@
+"""
+Core user-journey benchmark: seeds a synthetic database at a configurable scale, drives the
+real blueprints through the Flask test client (or, with --server gunicorn, over HTTP against a
+local gunicorn) and reports p50/p95/p99 latency, throughput and SQL statements per request for
+each scenario. Results are written as JSON so runs can be diffed between commits (--compare
+exits with status 1 on a regression).
+Usage: python -m benchmarks.journeys --users 2000 --competitions 50 --applications 6000 --iterations 200 \
+           --output bench.json [--compare baseline.json --threshold 20] [--server gunicorn --workers 2]
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select
+
+from config import Config
+from app import create_app, db
+from app.models.user import User
+from app.models.competition import Competition
+from app.models.application import Application
+from app.services.bootstrap import bootstrap_database
+from app.services.instrumentation import collect_queries
+from app.services.passwords import hash_password
+
+PASSWORD = 'Bench123!'
+ADMIN = {'email': 'admin@phg.com', 'password': 'Admin123!'}
+SCENARIOS = ('catalogue_browse', 'login', 'apply_upload', 'my_applications', 'admin_list', 'bulk_review')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HttpResponse = namedtuple('HttpResponse', 'status_code headers')
+
+
+def benchmark_config(workdir, bcrypt_rounds, debug_headers=False):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+        UPLOAD_FOLDER = os.path.join(workdir, 'uploads')
+        WTF_CSRF_ENABLED = False
+        RATELIMIT_ENABLED = False  # 所有请求来自同一 IP，测量的是应用本身而非限流
+        BCRYPT_LOG_ROUNDS = bcrypt_rounds
+        PASSWORD_HASH_BACKEND = 'inline'
+        METRICS_DEBUG_HEADERS = debug_headers  # gunicorn 模式下从 X-Query-Count 读取每个请求的 SQL 条数
+
+    return BenchmarkConfig
+
+
+def create_benchmark_app():
+    """gunicorn entry point ('benchmarks.journeys:create_benchmark_app()'); settings come from the environment"""
+    return create_app(benchmark_config(os.environ['BENCH_WORKDIR'], int(os.environ['BENCH_BCRYPT_ROUNDS']),
+                                       debug_headers=True))
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None  # 与测试客户端一致：不跟随重定向，直接返回 302
+
+
+class HttpClient:
+    """The subset of the Flask test client the scenarios use, over HTTP with a cookie jar"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(), _NoRedirect)
+
+    def get(self, path, headers=None):
+        return self._open(urllib.request.Request(self.base_url + path, headers=headers or {}))
+
+    def post(self, path, data=None, headers=None, content_type=None):
+        headers = dict(headers or {})
+        if content_type == 'multipart/form-data':
+            body, headers['Content-Type'] = _multipart(data or {})
+        else:
+            body = urllib.parse.urlencode(data or {}, doseq=True).encode('utf-8')
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        return self._open(urllib.request.Request(self.base_url + path, data=body, headers=headers, method='POST'))
+
+    def _open(self, req):
+        try:
+            with self._opener.open(req) as response:
+                response.read()
+                return HttpResponse(response.status, response.headers)
+        except urllib.error.HTTPError as e:
+            e.read()
+            return HttpResponse(e.code, e.headers)
+
+
+def _multipart(data):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in data.items():
+        if isinstance(value, tuple):
+            stream, filename = value
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                         f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8') + stream.read() + b'\r\n')
+        else:
+            for item in value if isinstance(value, list) else [value]:
+                parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                             f'{item}\r\n'.encode('utf-8'))
+    return b''.join(parts) + f'--{boundary}--\r\n'.encode('utf-8'), f'multipart/form-data; boundary={boundary}'
+
+
+def start_gunicorn(workdir, bcrypt_rounds, workers):
+    """Serve the benchmark database with a local gunicorn; returns (process, base URL) once it answers"""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    env = dict(os.environ, BENCH_WORKDIR=workdir, BENCH_BCRYPT_ROUNDS=str(bcrypt_rounds))
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--bind',
+                                f'127.0.0.1:{port}', '--log-level', 'warning',
+                                'benchmarks.journeys:create_benchmark_app()'], cwd=ROOT, env=env)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit('gunicorn exited during startup')
+        try:
+            urllib.request.urlopen(base_url + '/competitions/', timeout=1).read()
+            return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('gunicorn did not start within 30 s')
+
+
+def seed(users, competitions, applications, rng):
+    """Bulk-insert synthetic users, competitions and applications (one bcrypt hash shared by all users)"""
+    now = datetime.utcnow()
+    password_hash = hash_password(PASSWORD)
+    db.session.execute(insert(Competition), [{
+        'name': f'Benchmark Competition {index}',
+        'description': 'Synthetic competition for benchmarking. ' * 5,
+        'category': rng.choice(['Individual', 'Team', 'Individual/Team']),
+        'start_date': now + timedelta(days=30 + index),
+        # 约十分之一的赛事已截止报名
+        'application_deadline': now + (timedelta(days=-1) if index % 10 == 9 else timedelta(days=15 + index)),
+    } for index in range(competitions)])
+    db.session.execute(insert(User), [{
+        'username': f'bench{index}', 'email': f'bench{index}@example.com', 'password_hash': password_hash,
+        'consent_given': True, 'is_admin': False,
+    } for index in range(users)])
+    user_ids = db.session.scalars(select(User.id).where(User.username.like('bench%'))).all()
+    comp_ids = db.session.scalars(select(Competition.id).where(Competition.name.like('Benchmark%'))).all()
+    pairs = set()
+    # 预留最后 10% 的用户不报名，供 apply_upload 场景使用
+    applicants = user_ids[:max(1, int(len(user_ids) * 0.9))]
+    target = min(applications, len(applicants) * len(comp_ids))
+    while len(pairs) < target:
+        pairs.add((rng.choice(applicants), rng.choice(comp_ids)))
+    rows = [{
+        'user_id': user_id, 'competition_id': comp_id, 'team_name': None, 'notes': 'Synthetic application',
+        'status': rng.choice(['pending', 'pending', 'approved', 'rejected']),
+        'submission_date': now - timedelta(minutes=rng.randrange(60 * 24 * 90)),
+    } for user_id, comp_id in pairs]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(insert(Application), rows[start:start + 5000])
+    db.session.commit()
+    return user_ids, comp_ids, user_ids[len(applicants):]
+
+
+def logged_in_client(new_client, email, password):
+    client = new_client()
+    response = client.post('/auth/login', data={'email': email, 'password': password})
+    if response.status_code != 302:
+        raise SystemExit(f'login failed for {email}')
+    return client
+
+
+def build_scenarios(app, new_client, ctx, rng):
+    """Each scenario(i) does any untimed preparation and returns (request callable, expected status codes)"""
+    anonymous = new_client()
+    admin = logged_in_client(new_client, ADMIN['email'], ADMIN['password'])
+    members = [logged_in_client(new_client, f'bench{index}@example.com', PASSWORD) for index in range(10)]
+    fresh_emails = iter(ctx['fresh_emails'])
+    with app.app_context():
+        pending_ids = db.session.scalars(
+            select(Application.id).where(Application.status == 'pending').order_by(Application.id)).all()
+
+    def catalogue_browse(i):
+        path = '/competitions/' if i % 2 else f'/competitions/{rng.choice(ctx["comp_ids"])}'
+        return lambda: anonymous.get(path), (200,)
+
+    def login(i):
+        client = new_client()
+        email = f'bench{i % ctx["users"]}@example.com'
+        return lambda: client.post('/auth/login', data={'email': email, 'password': PASSWORD}), (302,)
+
+    def apply_upload(i):
+        email = next(fresh_emails, None)
+        if email is None:
+            raise SystemExit('not enough fresh users for apply_upload; raise --users or lower --iterations')
+        client = logged_in_client(new_client, email, PASSWORD)  # 登录不计入本场景耗时
+        document = os.urandom(32 * 1024)
+        return lambda: client.post('/competitions/apply', data={
+            'competition_id': str(ctx['open_comp_id']), 'team_name': 'Bench Team', 'notes': 'benchmark',
+            'document': (io.BytesIO(document), 'entry.pdf')}, content_type='multipart/form-data'), (302,)
+
+    def my_applications(i):
+        client = members[i % len(members)]
+        return lambda: client.get('/competitions/my-applications'), (200,)
+
+    def admin_list(i):
+        status = ('all', 'pending', 'approved', 'rejected')[i % 4]
+        return lambda: admin.get(f'/admin/applications?status={status}'), (200,)
+
+    def bulk_review(i):
+        offset = (i * 25) % max(1, len(pending_ids))
+        batch = pending_ids[offset:offset + 25] or pending_ids[:25]
+        data = {'status': ('approved', 'rejected')[i % 2], 'scope': 'selected', 'current_filter': 'pending',
+                'notes': 'benchmark', 'application_ids': [str(app_id) for app_id in batch]}
+        return lambda: admin.post('/admin/applications/bulk-review', headers={'Accept': 'application/json'},
+                                  data=data), (200,)
+
+    return {
+        'catalogue_browse': catalogue_browse,
+        'login': login,
+        'apply_upload': apply_upload,
+        'my_applications': my_applications,
+        'admin_list': admin_list,
+        'bulk_review': bulk_review,
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(scenario, iterations, warmup):
+    latencies, queries, errors = [], [], 0
+    for i in range(warmup + iterations):
+        call, expected = scenario(i)
+        with collect_queries() as stats:
+            start = time.perf_counter()
+            response = call()
+            elapsed = time.perf_counter() - start
+        if i < warmup:
+            continue  # 预热（填充缓存、编译模板），不计入结果
+        if response.status_code not in expected:
+            errors += 1
+        latencies.append(elapsed)
+        # gunicorn 模式下 SQL 在服务器进程中执行，条数由响应头带回
+        queries.append(int(response.headers.get('X-Query-Count', stats.count)))
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(total / len(latencies) * 1000, 3) if latencies else 0.0,
+        'throughput_rps': round(len(latencies) / total, 1) if total else 0.0,
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else 0.0,
+        'max_queries': max(queries, default=0),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print p95 / queries-per-request deltas against a previous run; returns the number of regressions"""
+    regressions = 0
+    print(f'\nCompared with {baseline.get("commit") or "baseline"} (threshold {threshold:.0f}% on p95):')
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            print(f'  {name:<18} new scenario')
+            continue
+        change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0.0
+        slower = change > threshold
+        more_queries = current['queries_per_request'] > previous['queries_per_request']
+        regressions += slower + more_queries
+        flags = ' '.join(flag for flag, hit in (('SLOWER', slower), ('MORE-QUERIES', more_queries)) if hit)
+        print(f'  {name:<18} p95 {previous["p95_ms"]:8.2f} -> {current["p95_ms"]:8.2f} ms ({change:+6.1f}%)  '
+              f'queries {previous["queries_per_request"]:.2f} -> {current["queries_per_request"]:.2f}  {flags}')
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=ROOT).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--competitions', type=int, default=50)
+    parser.add_argument('--applications', type=int, default=6000)
+    parser.add_argument('--iterations', type=int, default=100, help='measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='unmeasured requests per scenario')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--bcrypt-rounds', type=int, default=Config.BCRYPT_LOG_ROUNDS,
+                        help='cost used for seeded users and the login scenario')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for reproducible data')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='previous results JSON to diff against')
+    parser.add_argument('--threshold', type=float, default=20.0, help='allowed p95 slowdown in percent')
+    parser.add_argument('--server', choices=('test-client', 'gunicorn'), default='test-client',
+                        help='drive the app in-process or over HTTP against a local gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes (--server gunicorn)')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp()
+    server = None
+
+    try:
+        app = create_app(benchmark_config(workdir, args.bcrypt_rounds))
+        with app.app_context():
+            bootstrap_database(with_samples=False)
+            start = time.perf_counter()
+            user_ids, comp_ids, fresh_ids = seed(args.users, args.competitions, args.applications, rng)
+            seed_seconds = time.perf_counter() - start
+            open_comp_id = db.session.scalar(select(Competition.id).where(
+                Competition.application_deadline > datetime.utcnow()).order_by(Competition.id))
+            fresh_emails = db.session.scalars(select(User.email).where(User.id.in_(fresh_ids))).all()
+        print(f'Seeded {args.users} users, {args.competitions} competitions, {args.applications} applications '
+              f'in {seed_seconds:.1f} s')
+
+        ctx = {'users': len(user_ids), 'comp_ids': comp_ids, 'open_comp_id': open_comp_id,
+               'fresh_emails': fresh_emails}
+        new_client = app.test_client
+        if args.server == 'gunicorn':
+            server, base_url = start_gunicorn(workdir, args.bcrypt_rounds, args.workers)
+            new_client = partial(HttpClient, base_url)
+        scenarios = build_scenarios(app, new_client, ctx, rng)
+        results = {
+            'commit': _git_commit(),
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'python': platform.python_version(),
+            'server': args.server,
+            'scale': {'users': args.users, 'competitions': args.competitions, 'applications': args.applications,
+                      'iterations': args.iterations, 'bcrypt_rounds': args.bcrypt_rounds, 'seed': args.seed,
+                      'workers': args.workers if args.server == 'gunicorn' else None},
+            'scenarios': {},
+        }
+        print(f'{"scenario":<18} {"req":>5} {"err":>4} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} '
+              f'{"req/s":>8} {"q/req":>6}')
+        for name in args.scenarios:
+            summary = run_scenario(scenarios[name], args.iterations, args.warmup)
+            results['scenarios'][name] = summary
+            print(f'{name:<18} {summary["requests"]:>5} {summary["errors"]:>4} {summary["p50_ms"]:>9.2f} '
+                  f'{summary["p95_ms"]:>9.2f} {summary["p99_ms"]:>9.2f} {summary["throughput_rps"]:>8.1f} '
+                  f'{summary["queries_per_request"]:>6.2f}')
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+        print(f'Results written to {args.output}')
+    failed = any(summary['errors'] for summary in results['scenarios'].values())
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            failed |= compare(results, json.load(handle), args.threshold) > 0
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Password hashing throughput benchmark.
+Reports hashes/second and verifications/second for each bcrypt cost and backend,
+with N concurrent callers (simulating request threads).
+Usage: python -m benchmarks.password_hashing --rounds 10 12 --callers 4 --count 32
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.passwords import PasswordHasher, PASSWORD_HASH_BACKENDS
+
+
+def measure(hasher, operation, count, callers):
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda _: operation(), range(count)))
+        return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 12], help='bcrypt log rounds to compare')
+    parser.add_argument('--backends', nargs='+', choices=PASSWORD_HASH_BACKENDS, default=list(PASSWORD_HASH_BACKENDS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='process pool size')
+    parser.add_argument('--callers', type=int, default=4, help='concurrent calling threads')
+    parser.add_argument('--count', type=int, default=32, help='operations per measurement')
+    parser.add_argument('--json', dest='json_path', help='also write results to this JSON file')
+    args = parser.parse_args()
+
+    results = []
+    print(f'{"backend":<8} {"rounds":>6} {"hash/s":>10} {"verify/s":>10}')
+    for backend in args.backends:
+        for rounds in args.rounds:
+            hasher = PasswordHasher(rounds=rounds, backend=backend, workers=args.workers)
+            stored = hasher.hash('benchmark-password')  # 预热（含进程池启动）
+            hash_rate = measure(hasher, lambda: hasher.hash('benchmark-password'), args.count, args.callers)
+            verify_rate = measure(hasher, lambda: hasher.verify(stored, 'benchmark-password'), args.count, args.callers)
+            hasher.shutdown()
+            results.append({'backend': backend, 'rounds': rounds, 'workers': args.workers, 'callers': args.callers,
+                            'hashes_per_second': round(hash_rate, 2), 'verifications_per_second': round(verify_rate, 2)})
+            print(f'{backend:<8} {rounds:>6} {hash_rate:>10.2f} {verify_rate:>10.2f}')
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
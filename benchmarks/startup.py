@@ -0,0 +1,53 @@
+"""
+Startup budget check: create_app() must finish within a time budget and issue no SQL.
+Exits with status 1 when either limit is exceeded, so it can gate CI or a deploy.
+Usage: python -m benchmarks.startup --budget-ms 150 --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=150.0, help='maximum median create_app() time')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    statements = []
+    connections = []
+    event.listen(Engine, 'before_cursor_execute', lambda conn, cursor, statement, *rest: statements.append(statement))
+    event.listen(Engine, 'connect', lambda dbapi_conn, record: connections.append(record))
+
+    from app import create_app  # 导入成本（模块加载）单独计算，不计入预算
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        create_app()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    median = statistics.median(timings)
+    print(f'create_app(): median {median:.1f} ms, max {max(timings):.1f} ms over {args.runs} runs '
+          f'(budget {args.budget_ms:.0f} ms)')
+    print(f'SQL statements: {len(statements)}, DB connections opened: {len(connections)}')
+    failed = False
+    if median > args.budget_ms:
+        print('FAIL: startup time budget exceeded')
+        failed = True
+    if statements or connections:
+        print('FAIL: create_app() touched the database')
+        for statement in statements[:10]:
+            print(f'  {statement}')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
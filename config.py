@@ -1,18 +1,140 @@
 import os
 from datetime import timedelta
 
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def _env_limit(name, default):
+    # "次数/秒数"，例如 "10/600" 表示最多连续 10 次，之后每 60 秒恢复一次
+    capacity, period = os.environ.get(name, default).split('/')
+    return int(capacity), int(period)
+
+
+def _database_url():
+    url = os.environ.get('DATABASE_URL') or 'sqlite:///phg.db'
+    # 部分托管平台提供 postgres:// 前缀，SQLAlchemy 2.x 只接受 postgresql://
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def _engine_options(pool_size, max_overflow, pre_ping):
+    """连接池参数，环境变量优先于各配置档的默认值"""
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', pool_size),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', max_overflow),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', pre_ping),
+    }
+
+
 class Config:
     # 密钥（用于CSRF保护、Session加密）
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'phg-2025-secret-key-keep-safe'
-    # 数据库配置（SQLite，无需额外安装数据库，文件存储）
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///phg.db'
+    # 数据库配置（默认 SQLite 文件库；DATABASE_URL 可切换到 PostgreSQL，需安装 psycopg2）
+    SQLALCHEMY_DATABASE_URI = _database_url()
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # 关闭不必要的警告
+    # SQLite 生产调优：每个新连接执行的 PRAGMA（WAL 允许读写并发，busy_timeout 避免立即报 database is locked）
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -20000)),  # 负值单位为 KiB（约 20MB）
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'temp_store': 'MEMORY',
+    }
+    # 连接池（每个 gunicorn worker 一个池）
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(pool_size=5, max_overflow=10, pre_ping=False)
+    # 单条语句超时（毫秒，0 表示不限制；仅 PostgreSQL 生效）
+    DB_STATEMENT_TIMEOUT_MS = _env_int('DB_STATEMENT_TIMEOUT_MS', 0)
     # 上传文件配置（参赛申请可上传材料）
-    UPLOAD_FOLDER = os.path.join(os.getcwd(), 'app', 'static', 'uploads')
+    # 上传文件不放在 static 下，只能通过带权限检查的下载路由访问
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or os.path.join(os.getcwd(), 'instance', 'uploads')
+    # 下载交给前端 Web 服务器：None（Python 直接发送）/ 'x-sendfile'（Apache、lighttpd）/ 'x-accel-redirect'（nginx）
+    DOCUMENT_SENDFILE = os.environ.get('DOCUMENT_SENDFILE') or None
+    DOCUMENT_ACCEL_PREFIX = os.environ.get('DOCUMENT_ACCEL_PREFIX', '/protected-uploads/')  # nginx internal location
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 最大上传16MB
+    UPLOAD_CHUNK_SIZE = 64 * 1024  # 上传文件分块复制/哈希的块大小
+    # 后台文件清理队列（删除赛事/账号时的上传文件）
+    FILE_CLEANUP_ASYNC = True
+    FILE_CLEANUP_BATCH_SIZE = 100
+    FILE_CLEANUP_MAX_ATTEMPTS = 5
+    FILE_CLEANUP_RETRY_DELAY = 60  # 首次重试间隔（秒），之后指数退避
     # GDPR配置
-    DATA_RETENTION_PERIOD = timedelta(days=365)  # 数据保留1年
+    DATA_RETENTION_PERIOD = timedelta(days=_env_int('DATA_RETENTION_DAYS', 365))  # 数据保留1年
+    RETENTION_BATCH_SIZE = _env_int('RETENTION_BATCH_SIZE', 500)  # flask purge-expired 每个事务删除的行数
+    RETENTION_BATCH_PAUSE_MS = _env_int('RETENTION_BATCH_PAUSE_MS', 50)  # 批次间暂停，释放 SQLite 写锁
     PRIVACY_POLICY_URL = '/static/docs/privacy.pdf'  # 隐私政策路径
+    # 启动时自动建表并写入初始数据（仅建议开发环境开启；生产环境使用 flask bootstrap）
+    AUTO_BOOTSTRAP = _env_bool('AUTO_BOOTSTRAP')
+    # 密码哈希（bcrypt 成本因子；process 后端在独立进程池中计算，限制排队数量）
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_BACKEND = os.environ.get('PASSWORD_HASH_BACKEND', 'inline')  # inline / process
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0)) or None  # 默认 CPU 核数
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 0)) or None  # 默认 workers * 4
+    # 分页配置（管理员申请列表，基于 (submission_date, id) 游标分页）
+    APPLICATIONS_PER_PAGE = 50
+    APPLICATIONS_MAX_PER_PAGE = 200
+    # 赛事目录分页（按 (start_date, id) 游标分页，支持搜索与筛选）
+    COMPETITIONS_PER_PAGE = 24
+    COMPETITIONS_MAX_PER_PAGE = 100
+    # JSON API（/api/v1）分页
+    API_PER_PAGE = 50
+    API_MAX_PER_PAGE = 200
+    # 管理员仪表盘统计缓存时间（秒）
+    DASHBOARD_STATS_TTL = int(os.environ.get('DASHBOARD_STATS_TTL', 30))
+    # 匿名访客赛事目录页缓存时间上限（秒），同时不会超过下一个报名截止时间；
+    # 缓存按进程保存，管理员修改后其他 worker 最多在该时间内仍返回旧页面
+    CATALOGUE_CACHE_TTL = int(os.environ.get('CATALOGUE_CACHE_TTL', 60))
+    # 登录/注册限流（令牌桶，在 bcrypt 计算之前检查；RATELIMIT_STORAGE_URL=redis://... 可在多进程间共享）
+    RATELIMIT_ENABLED = _env_bool('RATELIMIT_ENABLED', True)
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL') or None
+    RATELIMIT_MAX_KEYS = _env_int('RATELIMIT_MAX_KEYS', 10000)  # 内存中最多保留的令牌桶数（LRU 淘汰）
+    RATELIMITS = {
+        'login_ip': _env_limit('RATELIMIT_LOGIN_IP', '30/60'),
+        'login_account': _env_limit('RATELIMIT_LOGIN_ACCOUNT', '10/600'),
+        'register_ip': _env_limit('RATELIMIT_REGISTER_IP', '10/600'),
+        'availability_ip': _env_limit('RATELIMIT_AVAILABILITY_IP', '60/60'),
+    }
+    # 反向代理层数（>0 时信任 X-Forwarded-For / X-Forwarded-Proto，限流才能取到真实客户端 IP）
+    PROXY_FIX_X_FOR = _env_int('PROXY_FIX_X_FOR', 0)
+    # 动态响应 gzip 压缩（静态资源由 flask build-assets 预压缩）；
+    # 含 CSRF 令牌的个人 HTML 页面不压缩（BREACH），仅压缩 Cache-Control: public 的匿名目录页
+    COMPRESS_ENABLED = _env_bool('COMPRESS_ENABLED', True)
+    COMPRESS_MIN_SIZE = _env_int('COMPRESS_MIN_SIZE', 1024)  # 小于该字节数的响应不压缩
+    COMPRESS_LEVEL = _env_int('COMPRESS_LEVEL', 6)
+    COMPRESS_MIMETYPES = ('application/json', 'text/plain')
+    # 请求级 SQL / 模板耗时统计；/admin/metrics 可用管理员会话或 Bearer METRICS_TOKEN 访问
+    METRICS_ENABLED = _env_bool('METRICS_ENABLED', True)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_DEBUG_HEADERS = None  # None 表示仅在 debug 模式下输出 X-Query-Count 等响应头
+    # 登录用户身份缓存（LRU 容量与过期时间，秒）
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 300))
+
+
+class ProductionConfig(Config):
+    """生产配置档：更大的连接池、pre-ping 检测断开的连接、默认 30 秒语句超时，从不自动建表"""
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(pool_size=10, max_overflow=20, pre_ping=True)
+    DB_STATEMENT_TIMEOUT_MS = _env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+    AUTO_BOOTSTRAP = False
+
+
+# 配置档（通过环境变量 APP_CONFIG 选择，默认 development）
+CONFIG_PROFILES = {
+    'development': Config,
+    'production': ProductionConfig,
+}
 
 # 创建上传文件夹（若不存在）
 if not os.path.exists(Config.UPLOAD_FOLDER):